@@ -0,0 +1,144 @@
+"""
+Per viewset action admission control.
+
+Viewsets declare how many requests of an action may run at once, per
+process (`action_limits`) and optionally across every process sharing the
+cache (`action_shared_limits`). Requests over the limit wait up to
+`action_queue_timeout` seconds for a slot, then get a fast 503 (or
+`action_reject_status`) response with a `Retry-After` header instead of
+piling up on the database connections.
+"""
+from functools import wraps
+from logging import getLogger
+from threading import BoundedSemaphore, Lock
+from time import sleep, time
+
+from django.http import HttpResponse
+
+from .cache import get_cache, make_key
+
+logger = getLogger("engine")
+
+
+class ActionLimiter:
+    """
+    Admission gate of one viewset action: a semaphore of `limit` slots,
+    plus a counter in the shared cache when `shared_limit` is set.
+    """
+
+    poll_interval = 0.05
+    # Expiry of the shared counter, so slots of a crashed process come back
+    counter_timeout = 300
+
+    def __init__(self, name, limit=None, shared_limit=None, queue_timeout=0, status=503, retry_after=5):
+        self.name = name
+        self.limit = limit
+        self.shared_limit = shared_limit
+        self.queue_timeout = queue_timeout
+        self.status = status
+        self.retry_after = retry_after
+        self.semaphore = BoundedSemaphore(limit) if limit else None
+        self.rejected = 0
+        self._rejected_lock = Lock()
+
+    def get_counter_key(self):
+        return make_key("admission", self.name)
+
+    def get_rejected_key(self):
+        return make_key("admission", self.name, "rejected")
+
+    def acquire_shared(self, deadline):
+        cache = get_cache()
+        key = self.get_counter_key()
+        while True:
+            try:
+                running = cache.incr(key)
+            except ValueError:
+                cache.add(key, 0, self.counter_timeout)
+                continue
+            if running <= self.shared_limit:
+                return True
+            self.release_shared()
+            if time() >= deadline:
+                return False
+            sleep(self.poll_interval)
+
+    def release_shared(self):
+        try:
+            get_cache().decr(self.get_counter_key())
+        except ValueError:
+            # The counter expired meanwhile
+            pass
+
+    def acquire(self):
+        """Wait for a slot, returning False when none frees up in time."""
+        deadline = time() + self.queue_timeout
+        if self.semaphore is not None and not self.semaphore.acquire(timeout=self.queue_timeout):
+            return False
+        if self.shared_limit and not self.acquire_shared(deadline):
+            if self.semaphore is not None:
+                self.semaphore.release()
+            return False
+        return True
+
+    def release(self):
+        if self.shared_limit:
+            self.release_shared()
+        if self.semaphore is not None:
+            self.semaphore.release()
+
+    def record_rejection(self):
+        with self._rejected_lock:
+            self.rejected += 1
+        cache = get_cache()
+        key = self.get_rejected_key()
+        if not cache.add(key, 1, None):
+            try:
+                cache.incr(key)
+            except ValueError:
+                pass
+        logger.warning("%s: request rejected, action is at its concurrency limit", self.name)
+
+    def get_shared_rejected(self):
+        """Return the rejected count of every process sharing the cache."""
+        return get_cache().get(self.get_rejected_key(), 0)
+
+    def get_reject_response(self):
+        response = HttpResponse("Server busy, retry later.", status=self.status, content_type="text/plain")
+        response["Retry-After"] = str(self.retry_after)
+        return response
+
+
+def admission_controlled(action):
+    """
+    Decorate the viewset method serving `action`, so it only runs once the
+    viewset limiter of that action (if any) admits the request.
+    """
+
+    def decorator(view_method):
+        @wraps(view_method)
+        def wrapper(viewset, request, *args, **kwargs):
+            limiter = viewset.get_action_limiter(action)
+            if limiter is None:
+                return view_method(viewset, request, *args, **kwargs)
+            if not limiter.acquire():
+                limiter.record_rejection()
+                return limiter.get_reject_response()
+            try:
+                response = view_method(viewset, request, *args, **kwargs)
+                # Template responses run their queries while rendering
+                if hasattr(response, "render") and not response.is_rendered:
+                    response.render()
+            except BaseException:
+                limiter.release()
+                raise
+            if getattr(response, "streaming", False):
+                # Hold the slot until the stream is consumed
+                response._resource_closers.append(limiter.release)
+            else:
+                limiter.release()
+            return response
+
+        return wrapper
+
+    return decorator
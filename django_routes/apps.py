@@ -7,3 +7,8 @@ class SimpelSitesConfig(AppConfig):
     name = "django_routes"
     label = "django_routes"
     verbose_name = "Django Routes"
+
+    def ready(self):
+        from .menus import track_permission_changes
+
+        track_permission_changes()
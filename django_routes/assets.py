@@ -0,0 +1,145 @@
+"""
+Per viewset asset bundles.
+
+`routes_bundle_assets` concatenates and minifies the extra css/js of every
+viewset action into content hashed files, with a precompressed `.gz`
+variant, and writes a manifest mapping each viewset action to its bundle.
+The `routes_assets` template tag then emits one tag per asset type, or the
+individual files while DEBUG is on or when no bundle was built.
+"""
+import gzip
+import hashlib
+import json
+import os
+import posixpath
+import re
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import staticfiles_storage
+
+BUNDLE_DIR = "routes/bundles"
+MANIFEST_NAME = "%s/manifest.json" % BUNDLE_DIR
+ASSET_ACTIONS = ("index", "inspect", "form")
+ASSET_TYPES = ("css", "js")
+
+_manifest = None
+
+CSS_COMMENTS_RE = re.compile(r"/\*.*?\*/", re.S)
+CSS_SPACES_RE = re.compile(r"\s+")
+CSS_PUNCTUATION_RE = re.compile(r"\s*([{};,>])\s*")
+# Whitespace before a colon is significant in selectors (`a :hover`), only
+# the whitespace after it can go
+CSS_COLON_RE = re.compile(r":\s+")
+# Both capture the text before the url, its quote, the url and the text after it
+CSS_URL_RE = re.compile(r"""(url\(\s*(['"]?))([^'")]+?)(\2\s*\))""")
+CSS_IMPORT_RE = re.compile(r"""(@import\s+(['"]))([^'"]+)(\2)""")
+
+
+def get_viewset_assets(viewset, action, asset_type):
+    """Return the extra `asset_type` files `viewset` declares for `action`."""
+    getter = getattr(viewset, "get_%s_view_extra_%s" % (action, asset_type), None)
+    return list(getter()) if getter else []
+
+
+def get_bundle_key(viewset, action, asset_type):
+    return "%s:%s:%s:%s" % (viewset.namespace, viewset.opts.label_lower, action, asset_type)
+
+
+def minify_css(source):
+    source = CSS_COMMENTS_RE.sub("", source)
+    source = CSS_SPACES_RE.sub(" ", source)
+    source = CSS_PUNCTUATION_RE.sub(r"\1", source)
+    return CSS_COLON_RE.sub(":", source).strip()
+
+
+def rewrite_css_urls(source, path, bundle_dir):
+    """
+    Rewrite the relative `url()` and `@import` references of `source`, read
+    from the static file `path`, so they resolve from `bundle_dir` where the
+    bundle is written. Absolute, scheme and data urls are kept as they are.
+    """
+    source_dir = posixpath.dirname(path)
+
+    def rewrite_url(url):
+        parts = urlsplit(url)
+        if parts.scheme or parts.netloc or not parts.path or url.startswith(("/", "#")):
+            return url
+        target = posixpath.normpath(posixpath.join(source_dir, parts.path))
+        query = "?%s" % parts.query if parts.query else ""
+        fragment = "#%s" % parts.fragment if parts.fragment else ""
+        return posixpath.relpath(target, bundle_dir) + query + fragment
+
+    def rewrite(match):
+        return match.group(1) + rewrite_url(match.group(3)) + match.group(4)
+
+    source = CSS_URL_RE.sub(rewrite, source)
+    return CSS_IMPORT_RE.sub(rewrite, source)
+
+
+def minify_js(source):
+    # Whitespace only, anything smarter needs a real JS parser
+    lines = (line.strip() for line in source.splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+def build_bundle(paths, asset_type, bundle_dir=BUNDLE_DIR):
+    """
+    Return the minified, concatenated content of the static `paths`, or None
+    when one of them can't be found locally (e.g. a CDN url). Relative urls
+    of css files are rewritten to resolve from `bundle_dir`.
+    """
+    sources = []
+    for path in paths:
+        absolute_path = finders.find(path)
+        if not absolute_path:
+            return None
+        with open(absolute_path, encoding="utf-8") as f:
+            source = f.read()
+        if asset_type == "css":
+            source = rewrite_css_urls(source, path, bundle_dir)
+        sources.append(source)
+    if asset_type == "css":
+        return "\n".join(minify_css(source) for source in sources)
+    return ";\n".join(minify_js(source) for source in sources)
+
+
+def write_bundle(output_dir, name, content):
+    """Write `content` and its `.gz` variant, returning the hashed static path."""
+    data = content.encode("utf-8")
+    root, ext = os.path.splitext(name)
+    path = "%s/%s.%s%s" % (BUNDLE_DIR, root, hashlib.md5(data).hexdigest()[:12], ext)
+    absolute_path = os.path.join(output_dir, path)
+    os.makedirs(os.path.dirname(absolute_path), exist_ok=True)
+    with open(absolute_path, "wb") as f:
+        f.write(data)
+    with gzip.open(absolute_path + ".gz", "wb", compresslevel=9) as f:
+        f.write(data)
+    return path
+
+
+def write_manifest(output_dir, manifest):
+    absolute_path = os.path.join(output_dir, MANIFEST_NAME)
+    os.makedirs(os.path.dirname(absolute_path), exist_ok=True)
+    with open(absolute_path, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+
+def get_manifest():
+    """Return the bundle manifest, read once per process from the static storage."""
+    global _manifest
+    if _manifest is None:
+        try:
+            with staticfiles_storage.open(MANIFEST_NAME) as f:
+                _manifest = json.loads(f.read().decode("utf-8"))
+        except (OSError, ValueError):
+            _manifest = {}
+    return _manifest
+
+
+def get_bundle(viewset, action, asset_type):
+    """Return the bundle path serving `viewset` `action` assets, None to use the individual files."""
+    if settings.DEBUG:
+        return None
+    return get_manifest().get(get_bundle_key(viewset, action, asset_type))
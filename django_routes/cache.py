@@ -0,0 +1,157 @@
+"""
+Shared cache helpers. Every cache used by django_routes goes through the
+cache configured by the `CACHE_ALIAS` setting, so entries are shared by all
+workers when a shared backend (memcached, redis) is configured.
+"""
+import hashlib
+from threading import Lock
+from time import sleep, time
+
+from django.core.cache import caches
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models.signals import m2m_changed, post_delete, post_save
+
+from .settings import routers_settings
+
+KEY_PREFIX = "routes"
+
+
+def get_cache():
+    return caches[routers_settings.CACHE_ALIAS]
+
+
+def make_key(*parts):
+    return ":".join([KEY_PREFIX] + [str(part) for part in parts])
+
+
+def hash_key(value):
+    """Return a short, stable digest of `value`'s repr, for use in cache keys."""
+    return hashlib.md5(repr(value).encode()).hexdigest()[:16]
+
+
+def get_version(name):
+    """
+    Return the version counter `name`. Cache entries derived from changing
+    data embed the counter in their key, so bumping it invalidates them.
+    """
+    cache = get_cache()
+    key = make_key("version", name)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, 1, timeout=None)
+        version = cache.get(key, 1)
+    return version
+
+
+def bump_version(name):
+    cache = get_cache()
+    key = make_key("version", name)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 2, timeout=None)
+
+
+def get_model_version(model):
+    """
+    Return the version counter of `model`, bumped on every change made
+    through the ORM signals or the bulk actions.
+    """
+    return get_version(model._meta.label_lower)
+
+
+def bump_model_version(model):
+    bump_version(model._meta.label_lower)
+
+
+def _bump_sender_version(sender, **kwargs):
+    bump_model_version(sender)
+
+
+def _bump_m2m_version(sender, instance, action, model, reverse, **kwargs):
+    if action.startswith("post_"):
+        bump_model_version(model if reverse else instance.__class__)
+
+
+def track_model_version(model):
+    """Connect the signals bumping `model` version when its rows change."""
+    uid = "routes_version_%s" % model._meta.label_lower
+    post_save.connect(_bump_sender_version, sender=model, dispatch_uid=uid)
+    post_delete.connect(_bump_sender_version, sender=model, dispatch_uid=uid)
+    for field in model._meta.many_to_many:
+        m2m_changed.connect(_bump_m2m_version, sender=field.remote_field.through, dispatch_uid=uid)
+
+
+def get_lookup_related_models(opts, lookup):
+    """
+    Return the related models whose fields `lookup` reads, following its
+    relations from the model of `opts`: `category__name` reads Category,
+    while `category` or `category__in` only compare the foreign key.
+    """
+    related_models = []
+    for position, part in enumerate(lookup.split("__")):
+        try:
+            field = opts.get_field(part)
+        except FieldDoesNotExist:
+            break
+        if position:
+            # The previous relation was followed to read `field`
+            related_models.append(opts.model)
+        if not field.is_relation or field.related_model is None:
+            break
+        opts = field.related_model._meta
+    return related_models
+
+
+# Striped in-process locks, a fixed set so keys never accumulate
+_coalesce_locks = [Lock() for _ in range(64)]
+
+
+def coalesce(key, compute, timeout, stale_timeout=0, lease_timeout=30, wait_timeout=10, poll_interval=0.05):
+    """
+    Return the cached value of `key`, calling `compute` to fill it in when
+    missing. Only one caller computes a given key at a time: the others,
+    threads of the same process or other processes, wait for the one
+    holding the `lease` cache entry to store its result, for up to
+    `wait_timeout` seconds before computing it themselves.
+
+    With `stale_timeout`, values are kept that many seconds past `timeout`
+    and served as is while a single caller recomputes them.
+    """
+    cache = get_cache()
+    lease_key = make_key("lease", key)
+    entry = cache.get(key)
+    if entry is not None:
+        value, fresh_until = entry
+        if fresh_until > time() or not cache.add(lease_key, 1, lease_timeout):
+            return value
+        # Stale, and this caller holds the lease: revalidate
+        try:
+            return _compute_and_set(cache, key, compute, timeout, stale_timeout)
+        finally:
+            cache.delete(lease_key)
+
+    lock = _coalesce_locks[hash(key) % len(_coalesce_locks)]
+    deadline = time() + wait_timeout
+    while True:
+        # The lock is only held to check and take the lease, never while
+        # polling, so other keys of the stripe don't wait on this one
+        with lock:
+            entry = cache.get(key)
+            if entry is not None:
+                return entry[0]
+            if cache.add(lease_key, 1, lease_timeout):
+                break
+        if time() >= deadline:
+            return compute()
+        sleep(poll_interval)
+    try:
+        return _compute_and_set(cache, key, compute, timeout, stale_timeout)
+    finally:
+        cache.delete(lease_key)
+
+
+def _compute_and_set(cache, key, compute, timeout, stale_timeout):
+    value = compute()
+    cache.set(key, (value, time() + timeout), timeout + stale_timeout)
+    return value
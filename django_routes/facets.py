@@ -0,0 +1,72 @@
+"""
+Filter facet counts.
+
+Each facet of a list viewset counts the rows per value of a choice, boolean
+or foreign key field with a single `values(field).annotate(Count)` query,
+capped to the `top_k` most frequent values. Counts of a facet are taken
+under every active filter except the facet's own, so the other choices of
+a filter keep their counts once one of them is selected.
+"""
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+from django.db.models import Count
+from django.utils.encoding import force_str
+from django.utils.text import capfirst
+from django.utils.translation import gettext as _
+
+COUNT_ALIAS = "_facet_count"
+
+
+def resolve_facet_field(opts, name):
+    """Return the model field of facet `name`, or None when it can't be faceted."""
+    try:
+        field = opts.get_field(name)
+    except FieldDoesNotExist:
+        return None
+    if not field.concrete:
+        return None
+    if field.many_to_one or field.one_to_one or field.flatchoices or isinstance(field, models.BooleanField):
+        return field
+    return None
+
+
+def count_facet(queryset, field, top_k):
+    """
+    Return the (value, count) pairs of `field` over `queryset`, most frequent
+    first, and whether values past `top_k` were left out.
+    """
+    rows = list(
+        queryset.order_by()
+        .values_list(field.attname)
+        .annotate(**{COUNT_ALIAS: Count("pk")})
+        .order_by("-%s" % COUNT_ALIAS, field.attname)[: top_k + 1]
+    )
+    return rows[:top_k], len(rows) > top_k
+
+
+def get_value_labels(field, values, empty_value_display, using=None):
+    """Return the display label of each of `values` of `field`, related objects being read from `using`."""
+    labels = {None: empty_value_display}
+    if field.is_relation:
+        related = field.related_model._base_manager.db_manager(using)
+        field_name = field.target_field.attname
+        objects = related.in_bulk([value for value in values if value is not None], field_name=field_name)
+        labels.update((pk, force_str(obj)) for pk, obj in objects.items())
+    elif field.flatchoices:
+        labels.update((key, force_str(label)) for key, label in field.flatchoices)
+    elif isinstance(field, models.BooleanField):
+        labels.update({True: _("Yes"), False: _("No")})
+    return [labels.get(value, force_str(value)) for value in values]
+
+
+def build_facet(name, field, rows, truncated, empty_value_display, using=None):
+    values = [value for value, count in rows]
+    labels = get_value_labels(field, values, empty_value_display, using)
+    return {
+        "name": name,
+        "label": force_str(capfirst(field.verbose_name)),
+        "choices": [
+            {"value": value, "label": label, "count": count} for (value, count), label in zip(rows, labels)
+        ],
+        "truncated": truncated,
+    }
@@ -1,3 +1,4 @@
+from .bulk import BulkActionHelper  # NOQA
 from .button import ButtonHelper  # NOQA
 from .permission import PermissionHelper  # NOQA
 from .url import URLHelper, URLFinder  # NOQA
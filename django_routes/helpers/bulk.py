@@ -0,0 +1,84 @@
+from logging import getLogger
+
+from django.db.models.deletion import Collector
+
+from ..cache import bump_model_version
+
+logger = getLogger("engine")
+
+
+class BulkActionHelper:
+    """
+    Runs set-based bulk actions (delete, update) for the `viewset` model.
+    Rows are processed in primary key ordered chunks of `chunk_size`, so a
+    single action never holds a lock on the whole table.
+    """
+
+    chunk_size = 500
+
+    def __init__(self, viewset, chunk_size=None):
+        self.viewset = viewset
+        self.model = viewset.model
+        self.opts = viewset.opts
+        if chunk_size is not None:
+            self.chunk_size = chunk_size
+
+    def iter_pk_chunks(self, queryset):
+        """
+        Yield lists of primary keys from `queryset`, using keyset pagination
+        so rows removed by a previous chunk don't shift the next one.
+        """
+        queryset = queryset.order_by("pk").values_list("pk", flat=True)
+        last_pk = None
+        while True:
+            chunk_qs = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+            chunk = list(chunk_qs[: self.chunk_size])
+            if not chunk:
+                return
+            yield chunk
+            if len(chunk) < self.chunk_size:
+                return
+            last_pk = chunk[-1]
+
+    def can_fast_delete(self, queryset):
+        """
+        Return a boolean to indicate whether rows of `queryset` can be deleted
+        without the collector, i.e. no cascades, signals or generic relations
+        apply to the model.
+        """
+        return Collector(using=queryset.db).can_fast_delete(queryset)
+
+    def report_progress(self, action, done, total):
+        """Called after each chunk; only logs when more than one chunk is needed."""
+        if total > self.chunk_size:
+            logger.info("%s %s: %s of %s rows processed", self.opts.label, action, done, total)
+
+    def delete(self, queryset, progress=None):
+        """Delete every row of `queryset`, returning the number of rows deleted."""
+        progress = progress or self.report_progress
+        total = queryset.count()
+        fast = self.can_fast_delete(queryset)
+        manager = self.model._base_manager.db_manager(queryset.db)
+        done = 0
+        for chunk in self.iter_pk_chunks(queryset):
+            chunk_qs = manager.filter(pk__in=chunk)
+            if fast:
+                done += chunk_qs._raw_delete(chunk_qs.db)
+            else:
+                done += chunk_qs.delete()[1].get(self.opts.label, 0)
+            progress("delete", done, total)
+        # Raw deletes and updates send no signals
+        bump_model_version(self.model)
+        return done
+
+    def update(self, queryset, values, progress=None):
+        """Apply `values` to every row of `queryset`, returning the number of rows updated."""
+        progress = progress or self.report_progress
+        total = queryset.count()
+        manager = self.model._base_manager.db_manager(queryset.db)
+        done = 0
+        for chunk in self.iter_pk_chunks(queryset):
+            done += manager.filter(pk__in=chunk).update(**values)
+            progress("update", done, total)
+        bump_model_version(self.model)
+        return done
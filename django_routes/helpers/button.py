@@ -1,7 +1,8 @@
-from django.contrib.admin.utils import quote
 from django.utils.encoding import force_str
 from django.utils.translation import gettext as _
 
+from .url import quote
+
 
 class ButtonHelper:
 
@@ -96,11 +97,12 @@ class ButtonHelper:
         ph = self.permission_helper
         usr = self.request.user
         pk = getattr(obj, self.opts.pk.attname)
+        has_view = self.viewset.has_view
         btns = []
-        if "inspect" not in exclude and ph.user_can_inspect_obj(usr, obj):
+        if "inspect" not in exclude and has_view("inspect_view") and ph.user_can_inspect_obj(usr, obj):
             btns.append(self.inspect_button(pk, classnames_add, classnames_exclude))
-        if "edit" not in exclude and ph.user_can_edit_obj(usr, obj):
+        if "edit" not in exclude and has_view("edit_view") and ph.user_can_edit_obj(usr, obj):
             btns.append(self.edit_button(pk, classnames_add, classnames_exclude))
-        if "delete" not in exclude and ph.user_can_delete_obj(usr, obj):
+        if "delete" not in exclude and has_view("delete_view") and ph.user_can_delete_obj(usr, obj):
             btns.append(self.delete_button(pk, classnames_add, classnames_exclude))
         return btns
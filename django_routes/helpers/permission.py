@@ -1,5 +1,8 @@
 from django.contrib.auth import get_permission_codename
 from django.contrib.auth.models import Permission
+from django.db.models import BooleanField, Case, Q, Value, When
+
+from ..cache import get_cache, make_key
 
 
 class PermissionHelper:
@@ -7,11 +10,31 @@ class PermissionHelper:
     Provides permission-related helper functions to help determine what a
     user can do with a 'typical' model (where permissions are granted
     model-wide), and to a specific instance of that model.
+
+    Setting `owner_field` (a relation to the user model) and/or `group_field`
+    (a relation, possibly many-to-many, to `auth.Group`) adds row level rules: users without the
+    model-wide permission only get the rows they own or share a group with.
+    The rules are applied in SQL by `filter_queryset` and `annotate_queryset`.
+    They also hold on public pages (`index_public`, `inspect_public`):
+    anonymous users get none of the restricted rows, and sitemaps only list
+    the rows anonymous users may open.
     """
 
+    permissions_cache_timeout = 300
+    owner_field = None
+    group_field = None
+    row_permission_annotations = {
+        "inspect": "_can_inspect",
+        "edit": "_can_edit",
+        "delete": "_can_delete",
+    }
+
     def __init__(self, model):
         self.model = model
         self.opts = model._meta
+        self.perm_codenames = {
+            action: get_permission_codename(action, self.opts) for action in self.opts.default_permissions
+        }
 
     def get_all_model_permissions(self):
         """
@@ -24,8 +47,24 @@ class PermissionHelper:
             content_type__model=self.opts.model_name,
         )
 
+    def get_all_model_permission_codenames(self):
+        """
+        Return the codenames of `get_all_model_permissions()`, kept in the
+        shared cache so they are loaded once for every worker.
+        """
+        cache = get_cache()
+        key = make_key("perms", self.opts.label_lower)
+        codenames = cache.get(key)
+        if codenames is None:
+            codenames = list(self.get_all_model_permissions().values_list("codename", flat=True))
+            cache.set(key, codenames, self.permissions_cache_timeout)
+        return codenames
+
     def get_perm_codename(self, action):
-        return get_permission_codename(action, self.opts)
+        try:
+            return self.perm_codenames[action]
+        except KeyError:
+            return get_permission_codename(action, self.opts)
 
     def user_has_specific_permission(self, user, perm_codename):
         """
@@ -39,11 +78,75 @@ class PermissionHelper:
         Return a boolean to indicate whether `user` has any model-wide
         permissions
         """
-        for perm in self.get_all_model_permissions().values("codename"):
-            if self.user_has_specific_permission(user, perm["codename"]):
+        for codename in self.get_all_model_permission_codenames():
+            if self.user_has_specific_permission(user, codename):
                 return True
         return False
 
+    def has_row_rules(self):
+        return bool(self.owner_field or self.group_field)
+
+    def get_row_permission_q(self, user):
+        """
+        Return a Q object matching the rows `user` is granted through
+        `owner_field` or `group_field`.
+        """
+        q = Q(pk__in=[])
+        if not user.is_authenticated:
+            return q
+        if self.owner_field:
+            q |= Q(**{self.owner_field: user.pk})
+        if self.group_field:
+            # A subquery keeps many-to-many group fields from duplicating rows
+            members = self.model._base_manager.filter(**{"%s__in" % self.group_field: user.groups.all()})
+            q |= Q(pk__in=members.values("pk"))
+        return q
+
+    def user_has_model_permission(self, user, action):
+        """Return a boolean to indicate whether `user` can `action` every instance."""
+        if action == "inspect":
+            return self.user_has_any_permissions(user)
+        perm_codename = self.get_perm_codename("change" if action == "edit" else action)
+        return self.user_has_specific_permission(user, perm_codename)
+
+    def filter_queryset(self, user, queryset):
+        """
+        Restrict `queryset` to the rows `user` may inspect, in SQL, so
+        pagination and counts stay correct.
+        """
+        if not self.has_row_rules() or self.user_has_model_permission(user, "inspect"):
+            return queryset
+        return queryset.filter(self.get_row_permission_q(user))
+
+    def annotate_queryset(self, user, queryset):
+        """
+        Annotate each row with booleans answering the per object checks
+        (`_can_inspect`, `_can_edit`, `_can_delete`), so buttons and
+        `user_can_*_obj` need no extra query per row.
+        """
+        if not self.has_row_rules():
+            return queryset
+        q = self.get_row_permission_q(user)
+        annotations = {}
+        for action, name in self.row_permission_annotations.items():
+            if self.user_has_model_permission(user, action):
+                annotations[name] = Value(True, output_field=BooleanField())
+            else:
+                annotations[name] = Case(When(q, then=Value(True)), default=Value(False), output_field=BooleanField())
+        return queryset.annotate(**annotations)
+
+    def user_has_row_permission(self, user, obj, action):
+        """
+        Answer a per object check from the row annotation when `obj` carries
+        it, otherwise with a single query applying the row rules.
+        """
+        granted = getattr(obj, self.row_permission_annotations[action], None)
+        if granted is not None:
+            return granted
+        if obj is None or not user.is_authenticated:
+            return False
+        return self.model._default_manager.filter(self.get_row_permission_q(user), pk=obj.pk).exists()
+
     def user_can_list(self, user):
         """
         Return a boolean to indicate whether `user` is permitted to access the
@@ -64,7 +167,9 @@ class PermissionHelper:
         Return a boolean to indicate whether `user` is permitted to 'inspect'
         a specific `self.model` instance.
         """
-        return self.user_has_any_permissions(user)
+        if self.user_has_any_permissions(user):
+            return True
+        return self.has_row_rules() and self.user_has_row_permission(user, obj, "inspect")
 
     def user_can_edit_obj(self, user, obj):
         """
@@ -72,7 +177,9 @@ class PermissionHelper:
         a specific `self.model` instance.
         """
         perm_codename = self.get_perm_codename("change")
-        return self.user_has_specific_permission(user, perm_codename)
+        if self.user_has_specific_permission(user, perm_codename):
+            return True
+        return self.has_row_rules() and self.user_has_row_permission(user, obj, "edit")
 
     def user_can_delete_obj(self, user, obj):
         """
@@ -80,8 +187,33 @@ class PermissionHelper:
         a specific `self.model` instance.
         """
         perm_codename = self.get_perm_codename("delete")
+        if self.user_has_specific_permission(user, perm_codename):
+            return True
+        return self.has_row_rules() and self.user_has_row_permission(user, obj, "delete")
+
+    def user_can_bulk_edit(self, user):
+        """
+        Return a boolean to indicate whether `user` is permitted to 'change'
+        many `self.model` instances at once. Checked once per bulk action.
+        """
+        perm_codename = self.get_perm_codename("change")
         return self.user_has_specific_permission(user, perm_codename)
 
+    def user_can_bulk_delete(self, user):
+        """
+        Return a boolean to indicate whether `user` is permitted to 'delete'
+        many `self.model` instances at once. Checked once per bulk action.
+        """
+        perm_codename = self.get_perm_codename("delete")
+        return self.user_has_specific_permission(user, perm_codename)
+
+    def user_can_profile(self, user):
+        """
+        Return a boolean to indicate whether `user` may run requests of
+        `self.model` views under the profiler, and read the stored profiles.
+        """
+        return user.is_active and user.is_staff
+
     def user_can_unpublish_obj(self, user, obj):
         return False
 
@@ -89,11 +221,12 @@ class PermissionHelper:
         return False
 
     def user_is_owner_or_admin(self, user, obj, owner_field):
-        obj_owner = getattr(obj, owner_field, None)
-        if (obj_owner and obj_owner is user) or user.is_superadmin:
+        if user.is_superuser:
             return True
-        else:
-            return False
+        # Compare the raw foreign key, no need to fetch the owner
+        field = self.opts.get_field(owner_field)
+        owner_pk = getattr(obj, field.attname, None)
+        return owner_pk is not None and owner_pk == user.pk
 
     def user_is_member(self, group_name):
         """Return a boolean to indicate whether `user` is a member of a
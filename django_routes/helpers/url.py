@@ -1,8 +1,17 @@
-from django.contrib.admin.utils import quote as admin_quote
 from django.urls import reverse
 from django.utils.functional import cached_property
 
 
+def quote(value):
+    """
+    `django.contrib.admin.utils.quote`, imported on first use since it
+    loads the whole admin package.
+    """
+    from django.contrib.admin.utils import quote as admin_quote
+
+    return admin_quote(value)
+
+
 class URLHelper:
     def __init__(self, namespace, model):
         self.namespace = namespace
@@ -29,6 +38,9 @@ class URLHelper:
         url_name = self.get_name(action)
         return reverse(url_name, args=args, kwargs=kwargs)
 
+    def get_action_url(self, action, *args, **kwargs):
+        return self.get_url(action, *args, **kwargs)
+
     @cached_property
     def index_url(self):
         return self.get_url("index")
@@ -45,4 +57,4 @@ class URLFinder:
 
     def get_edit_url(self, instance):
         if self.permission_helper.user_can_edit_obj(self.user, instance):
-            return self.url_helper.get_url("edit", admin_quote(instance.pk))
+            return self.url_helper.get_url("edit", quote(instance.pk))
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.module_loading import import_string
+
+
+class Command(BaseCommand):
+    help = (
+        "List the concurrency limits declared by the viewsets of a router, with the number of "
+        "requests rejected by every process sharing the cache."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--router",
+            default="django_routes.urls.site",
+            help="Dotted path of the router instance to report on.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            router = import_string(options["router"])
+        except ImportError as err:
+            raise CommandError(err)
+        row = "%-50s %8s %8s %10s"
+        self.stdout.write(row % ("action", "limit", "shared", "rejected"))
+        for viewset in router.registry:
+            actions = sorted(set(viewset.action_limits) | set(viewset.action_shared_limits))
+            for action in actions:
+                limiter = viewset.get_action_limiter(action)
+                if limiter is None:
+                    continue
+                rejected = limiter.get_shared_rejected()
+                self.stdout.write(row % (limiter.name, limiter.limit or "-", limiter.shared_limit or "-", rejected))
@@ -0,0 +1,58 @@
+import posixpath
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.module_loading import import_string
+
+from django_routes.assets import (
+    ASSET_ACTIONS,
+    ASSET_TYPES,
+    BUNDLE_DIR,
+    build_bundle,
+    get_bundle_key,
+    get_viewset_assets,
+    write_bundle,
+    write_manifest,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Concatenate and minify the extra css/js of every viewset action into content hashed "
+        "bundles with .gz variants, and write the manifest used by the routes_assets template tag."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--router",
+            default="django_routes.urls.site",
+            help="Dotted path of the router instance to bundle assets for.",
+        )
+        parser.add_argument("--output", help="Directory the bundles are written to, defaults to STATIC_ROOT.")
+
+    def handle(self, *args, **options):
+        try:
+            router = import_string(options["router"])
+        except ImportError as err:
+            raise CommandError(err)
+        output_dir = options["output"] or settings.STATIC_ROOT
+        if not output_dir:
+            raise CommandError("Set STATIC_ROOT or pass --output.")
+        manifest = {}
+        for viewset in router.registry:
+            for action in ASSET_ACTIONS:
+                for asset_type in ASSET_TYPES:
+                    paths = get_viewset_assets(viewset, action, asset_type)
+                    if not paths:
+                        continue
+                    name = "%s/%s.%s.%s" % (viewset.namespace, viewset.opts.label_lower, action, asset_type)
+                    bundle_dir = posixpath.dirname("%s/%s" % (BUNDLE_DIR, name))
+                    content = build_bundle(paths, asset_type, bundle_dir)
+                    key = get_bundle_key(viewset, action, asset_type)
+                    if content is None:
+                        self.stderr.write("%s: not every asset is a local static file, skipped." % key)
+                        continue
+                    manifest[key] = write_bundle(output_dir, name, content)
+                    self.stdout.write("%s -> %s" % (key, manifest[key]))
+        write_manifest(output_dir, manifest)
+        self.stdout.write(self.style.SUCCESS("Wrote %s bundles." % len(manifest)))
@@ -0,0 +1,162 @@
+import random
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import Client
+from django.utils.module_loading import import_string
+
+DEFAULT_MIX = "list=5,filter=2,inspect=3,export=1"
+
+
+def percentile(sorted_values, percent):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(percent / 100.0 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class Command(BaseCommand):
+    help = (
+        "Drive the viewsets of a router in-process with the Django test client from many threads "
+        "and report requests per second and p50/p95/p99 latency per viewset action."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--router",
+            default="django_routes.urls.site",
+            help="Dotted path of the router instance to load.",
+        )
+        parser.add_argument("--user", help="Username the requests are authenticated as.")
+        parser.add_argument("--threads", type=int, default=8, help="Number of concurrent client threads.")
+        parser.add_argument("--requests", type=int, default=1000, help="Total number of requests to send.")
+        parser.add_argument(
+            "--mix",
+            default=DEFAULT_MIX,
+            help="Weights of the request kinds, defaults to '%s'." % DEFAULT_MIX,
+        )
+        parser.add_argument("--host", help="Host header of the requests, defaults to the first ALLOWED_HOSTS.")
+        parser.add_argument("--seed", type=int, help="Random seed, for a reproducible request sequence.")
+
+    def parse_mix(self, mix):
+        weights = {}
+        for item in mix.split(","):
+            kind, _, weight = item.partition("=")
+            if kind not in ("list", "filter", "inspect", "export"):
+                raise CommandError("Unknown request kind '%s'." % kind)
+            weights[kind] = int(weight or 1)
+        return weights
+
+    def get_targets(self, router, weights):
+        """
+        Return (label, weight, url, params, headers) tuples for every viewset
+        action the router serves. Filter requests pick values from existing
+        rows, inspect requests spread over the first pks.
+        """
+        targets = []
+        for viewset in router.registry:
+            name = viewset.__class__.__name__
+            if not hasattr(viewset, "index_view"):
+                continue
+            index_url = viewset.url_helper.index_url
+            if weights.get("list"):
+                targets.append(("%s.list" % name, weights["list"], index_url, {}, {}))
+            if weights.get("export"):
+                # The JSON list response is the export path of a viewset
+                headers = {"HTTP_ACCEPT": "application/json"}
+                targets.append(("%s.export" % name, weights["export"], index_url, {}, headers))
+            fields = viewset.get_filterset_fields()
+            if weights.get("filter") and fields:
+                field = fields[0]
+                # A None value would be sent as the "None" string
+                queryset = viewset.get_queryset().exclude(**{field: None})
+                values = list(queryset.values_list(field, flat=True).distinct()[:20])
+                for value in values:
+                    weight = weights["filter"] / len(values)
+                    targets.append(("%s.filter" % name, weight, index_url, {field: value}, {}))
+            if weights.get("inspect") and hasattr(viewset, "inspect_view"):
+                pks = list(viewset.get_queryset().values_list("pk", flat=True)[:100])
+                for pk in pks:
+                    url = viewset.url_helper.get_url("inspect", pk)
+                    targets.append(("%s.inspect" % name, weights["inspect"] / len(pks), url, {}, {}))
+        return targets
+
+    def get_user(self, username):
+        if not username:
+            return None
+        try:
+            return get_user_model()._default_manager.get_by_natural_key(username)
+        except get_user_model().DoesNotExist:
+            raise CommandError("User '%s' does not exist." % username)
+
+    def get_client(self, user, host):
+        hosts = [h for h in settings.ALLOWED_HOSTS if not h.startswith(".") and h != "*"]
+        # Failing views are recorded as 500 responses instead of ending the run
+        client = Client(raise_request_exception=False, HTTP_HOST=host or (hosts[0] if hosts else "localhost"))
+        if user is not None:
+            client.force_login(user)
+        return client
+
+    def handle(self, *args, **options):
+        try:
+            router = import_string(options["router"])
+        except ImportError as err:
+            raise CommandError(err)
+        router.urls
+        user = self.get_user(options["user"])
+        rng = random.Random(options["seed"])
+        targets = self.get_targets(router, self.parse_mix(options["mix"]))
+        if not targets:
+            raise CommandError("The router serves no list or inspect views.")
+        plan = rng.choices(targets, weights=[t[1] for t in targets], k=options["requests"])
+        threads = max(1, options["threads"])
+        chunks = [plan[i::threads] for i in range(threads)]
+
+        def run(chunk):
+            client = self.get_client(user, options["host"])
+            results = []
+            try:
+                for label, weight, url, params, headers in chunk:
+                    start = perf_counter()
+                    response = client.get(url, params, **headers)
+                    results.append((label, perf_counter() - start, response.status_code))
+            finally:
+                # Every thread opened its own database connections
+                connections.close_all()
+            return results
+
+        started = perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            results = [result for chunk_results in executor.map(run, chunks) for result in chunk_results]
+        elapsed = perf_counter() - started
+
+        timings = defaultdict(list)
+        errors = defaultdict(int)
+        for label, duration, status in results:
+            timings[label].append(duration * 1000)
+            if status >= 400:
+                errors[label] += 1
+        row = "%-40s %8s %8s %9s %9s %9s %7s"
+        self.stdout.write(row % ("action", "requests", "rps", "p50 ms", "p95 ms", "p99 ms", "errors"))
+        for label in sorted(timings):
+            values = sorted(timings[label])
+            self.stdout.write(
+                row
+                % (
+                    label,
+                    len(values),
+                    "%.1f" % (len(values) / elapsed),
+                    "%.1f" % percentile(values, 50),
+                    "%.1f" % percentile(values, 95),
+                    "%.1f" % percentile(values, 99),
+                    errors[label],
+                )
+            )
+        self.stdout.write(
+            self.style.SUCCESS("%s requests in %.2f s, %.1f rps" % (len(results), elapsed, len(results) / elapsed))
+        )
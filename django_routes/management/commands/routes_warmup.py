@@ -0,0 +1,79 @@
+from time import perf_counter
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.utils.module_loading import import_string
+
+
+class Command(BaseCommand):
+    """
+    Only entries of the shared cache outlive the command, so it fills those
+    alone: permission codenames, list counts and, through page requests,
+    the render cache. In-process caches (templates, table classes, url
+    reversing) are per worker and warm up on their first requests.
+    """
+
+    help = (
+        "Prime the shared cache entries of every viewset registered on a router: permission codenames "
+        "and list counts. Optionally requests the first list and inspect pages."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--router",
+            default="django_routes.urls.site",
+            help="Dotted path of the router instance to warm up.",
+        )
+        parser.add_argument("--user", help="Username used to render pages and resolve permissions.")
+        parser.add_argument("--pages", type=int, default=0, help="Number of list pages to request per viewset.")
+        parser.add_argument("--inspect", type=int, default=0, help="Number of inspect pages to request per viewset.")
+        parser.add_argument("--host", help="Host header of the page requests, defaults to the first ALLOWED_HOSTS.")
+
+    def get_user(self, username):
+        if not username:
+            return AnonymousUser()
+        try:
+            return get_user_model()._default_manager.get_by_natural_key(username)
+        except get_user_model().DoesNotExist:
+            raise CommandError("User '%s' does not exist." % username)
+
+    def get_client(self, user, host):
+        hosts = [h for h in settings.ALLOWED_HOSTS if not h.startswith(".") and h != "*"]
+        client = Client(HTTP_HOST=host or (hosts[0] if hosts else "localhost"))
+        if user.is_authenticated:
+            client.force_login(user)
+        return client
+
+    def warmup_viewset(self, viewset, client, pages, inspect):
+        if hasattr(viewset, "permission_helper"):
+            viewset.permission_helper.get_all_model_permission_codenames()
+        if hasattr(viewset, "index_view"):
+            # Count on the database the list pages read from, so they find the cached count
+            queryset = viewset.get_read_queryset()
+            paginator = viewset.get_paginator_class()(queryset, viewset.get_paginate_by() or 1)
+            paginator.count
+            for number in range(1, min(pages, paginator.num_pages) + 1):
+                client.get(viewset.url_helper.index_url, {"page": number})
+        if inspect and hasattr(viewset, "inspect_view"):
+            for pk in viewset.get_warmup_inspect_pks(inspect):
+                client.get(viewset.url_helper.get_url("inspect", pk))
+
+    def handle(self, *args, **options):
+        try:
+            router = import_string(options["router"])
+        except ImportError as err:
+            raise CommandError(err)
+        # Compile the url patterns before anything reverses them
+        router.urls
+        user = self.get_user(options["user"])
+        client = self.get_client(user, options["host"])
+        total = perf_counter()
+        for viewset in router.registry:
+            start = perf_counter()
+            self.warmup_viewset(viewset, client, options["pages"], options["inspect"])
+            self.stdout.write("%s: %.1f ms" % (viewset.__class__.__name__, (perf_counter() - start) * 1000))
+        elapsed = (perf_counter() - total) * 1000
+        self.stdout.write(self.style.SUCCESS("Warmed up %s viewsets in %.1f ms" % (len(router.registry), elapsed)))
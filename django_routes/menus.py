@@ -0,0 +1,118 @@
+"""
+Navigation menu built from the viewsets registered on a router.
+
+The sorted menu tree is built once per router. The items a user may see
+are cached in the shared cache under the user's permission fingerprint:
+pk, superuser/active flags and a global permissions version bumped
+whenever user, group or permission assignments change. Rendering the menu
+therefore costs no database query once the user's entry is cached.
+"""
+from django.contrib.auth import get_user_model
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.utils.functional import cached_property
+
+from .cache import bump_version, get_cache, get_version, hash_key, make_key
+
+PERMISSIONS_VERSION = "permissions"
+
+
+class MenuItem:
+    __slots__ = ("viewset", "name", "label", "icon", "order", "url")
+
+    def __init__(self, viewset):
+        self.viewset = viewset
+        self.name = viewset.url_helper.get_name("index")
+        self.label = viewset.get_menu_label()
+        self.icon = viewset.get_menu_icon()
+        self.order = viewset.get_menu_order()
+        self.url = viewset.url_helper.index_url
+
+    def is_shown(self, user):
+        viewset = self.viewset
+        return viewset.index_public or viewset.permission_helper.user_can_list(user)
+
+
+class MenuGroup:
+    __slots__ = ("label", "items", "order")
+
+    def __init__(self, label, items):
+        self.label = label
+        self.items = items
+        self.order = min(item.order for item in items)
+
+
+class Menu:
+    cache_timeout = 3600
+
+    def __init__(self, router):
+        self.router = router
+
+    @cached_property
+    def items(self):
+        items = [MenuItem(viewset) for viewset in self.router.registry if viewset.has_view("index_view")]
+        return sorted(items, key=lambda item: (item.order, item.label))
+
+    @cached_property
+    def tree(self):
+        """Return the menu items grouped by application, groups and items sorted by menu order."""
+        groups = {}
+        for item in self.items:
+            label = item.viewset.opts.app_config.verbose_name
+            groups.setdefault(label, []).append(item)
+        return sorted((MenuGroup(label, items) for label, items in groups.items()), key=lambda g: (g.order, g.label))
+
+    @cached_property
+    def items_key(self):
+        """
+        Digest of the item names: processes whose routers registered other
+        viewsets under the same namespace must not share cache entries.
+        """
+        return hash_key([item.name for item in self.items])
+
+    def get_cache_key(self, user):
+        return make_key(
+            "menu",
+            self.router.namespace,
+            self.items_key,
+            user.pk,
+            int(user.is_superuser),
+            int(user.is_active),
+            get_version(PERMISSIONS_VERSION),
+        )
+
+    def get_visible_names(self, user):
+        cache = get_cache()
+        key = self.get_cache_key(user)
+        names = cache.get(key)
+        if names is None:
+            names = [item.name for item in self.items if item.is_shown(user)]
+            cache.set(key, names, self.cache_timeout)
+        return set(names)
+
+    def get_tree(self, user):
+        """Return the menu groups, restricted to the items `user` may see."""
+        names = self.get_visible_names(user)
+        tree = []
+        for group in self.tree:
+            items = [item for item in group.items if item.name in names]
+            if items:
+                tree.append(MenuGroup(group.label, items))
+        return tree
+
+
+def _bump_permissions_version(**kwargs):
+    bump_version(PERMISSIONS_VERSION)
+
+
+def track_permission_changes():
+    """Connect the signals invalidating cached menus when permissions or group memberships change."""
+    from django.contrib.auth.models import Group, Permission
+
+    uid = "routes_menu_permissions"
+    # User saves are left out on purpose (last_login), the flags that matter are in the key
+    for model in (Group, Permission):
+        post_save.connect(_bump_permissions_version, sender=model, dispatch_uid=uid)
+        post_delete.connect(_bump_permissions_version, sender=model, dispatch_uid=uid)
+    for model in (get_user_model(), Group):
+        for field in model._meta.many_to_many:
+            m2m_changed.connect(_bump_permissions_version, sender=field.remote_field.through, dispatch_uid=uid)
@@ -0,0 +1,81 @@
+from django.core.exceptions import EmptyResultSet
+from django.core.paginator import EmptyPage, Page, PageNotAnInteger, Paginator
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+
+from .cache import coalesce, get_model_version, hash_key, make_key
+
+
+class CachedCountPaginator(Paginator):
+    """
+    A paginator keeping `count` in the shared cache, keyed by the SQL of the
+    paginated queryset and the model version, so workers don't each pay for
+    the same COUNT query.
+    Concurrent misses are coalesced into a single query, and with
+    `count_stale_timeout` an expired count keeps being served while one
+    worker refreshes it.
+    """
+
+    count_cache_timeout = 60
+    count_stale_timeout = 0
+
+    def get_count_cache_key(self):
+        query = getattr(self.object_list, "query", None)
+        if query is None:
+            return None
+        try:
+            sql = str(query)
+        except EmptyResultSet:
+            return None
+        # The model version drops the cached counts once a row is added or removed
+        return make_key("count", self.object_list.db, get_model_version(self.object_list.model), hash_key(sql))
+
+    @cached_property
+    def count(self):
+        key = self.get_count_cache_key()
+        if key is None:
+            return super().count
+        return coalesce(key, self.get_uncached_count, self.count_cache_timeout, self.count_stale_timeout)
+
+    def get_uncached_count(self):
+        return super().count
+
+
+class UncountedPage(Page):
+    """A page of an `UncountedPaginator`, only knowing if a next page exists."""
+
+    def __init__(self, object_list, number, paginator, has_next):
+        super().__init__(object_list, number, paginator)
+        self._has_next = has_next
+
+    def has_next(self):
+        return self._has_next
+
+
+class UncountedPaginator(Paginator):
+    """
+    A paginator running no COUNT query, used when counting the list timed
+    out: whether a next page exists is read by looking one row past the
+    page. `count` and `num_pages` are None, `page_range` is empty.
+    """
+
+    count = None
+    num_pages = None
+    page_range = ()
+
+    def validate_number(self, number):
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger(_("That page number is not an integer"))
+        if number < 1:
+            raise EmptyPage(_("That page number is less than 1"))
+        return number
+
+    def page(self, number):
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        top = bottom + self.per_page
+        # The page itself stays lazy, like the object list of a counted page
+        has_next = self.object_list[top:top + 1].exists()
+        return UncountedPage(self.object_list[bottom:top], number, self, has_next)
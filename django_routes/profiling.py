@@ -0,0 +1,198 @@
+"""
+On-demand profiling of single list and inspect requests.
+
+A user allowed by `PermissionHelper.user_can_profile` adds `?_profile=1`
+(or the `X-Profile` header) to a page: the request then runs under cProfile
+while its SQL queries and template renders are timed. The result is written
+to a ring of JSON files in the `PROFILE_DIR` setting, keeping the last
+`PROFILE_RING_SIZE` ones, and shown by the router profile pages.
+"""
+import json
+import os
+import re
+import tempfile
+from contextlib import ExitStack
+from functools import wraps
+from threading import Lock, local
+from time import perf_counter, time
+from uuid import uuid4
+
+from django.db import connections
+from django.template.base import Template
+
+from .settings import routers_settings
+
+PROFILE_PARAM = "_profile"
+PROFILE_HEADER = "X-Profile"
+PROFILE_ID_RE = re.compile(r"^\d+-[0-9a-f]{8}$")
+
+_local = local()
+_template_hook_lock = Lock()
+_template_hook_installed = False
+
+
+def wants_profile(request):
+    return bool(request.GET.get(PROFILE_PARAM) or request.headers.get(PROFILE_HEADER))
+
+
+def get_profile_dir():
+    return routers_settings.PROFILE_DIR or os.path.join(tempfile.gettempdir(), "django_routes_profiles")
+
+
+def install_template_hook():
+    """
+    Time `Template._render`, which every template, extended or included,
+    goes through. Only renders of a thread running a profiler are recorded.
+    """
+    global _template_hook_installed
+    with _template_hook_lock:
+        if _template_hook_installed:
+            return
+        original = Template._render
+
+        def _render(template, context):
+            profiler = getattr(_local, "profiler", None)
+            if profiler is None:
+                return original(template, context)
+            start = perf_counter()
+            try:
+                return original(template, context)
+            finally:
+                profiler.templates.append({"name": template.name, "time": (perf_counter() - start) * 1000})
+
+        Template._render = _render
+        _template_hook_installed = True
+
+
+class RequestProfiler:
+    """Profile the code run inside it, recording SQL queries and template renders."""
+
+    sort_by = "cumulative"
+    stats_lines = 80
+
+    def __init__(self):
+        self.queries = []
+        self.templates = []
+        self.duration = None
+
+    def record_query(self, execute, sql, params, many, context):
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append(
+                {
+                    "alias": context["connection"].alias,
+                    "sql": sql,
+                    "time": (perf_counter() - start) * 1000,
+                }
+            )
+
+    def __enter__(self):
+        install_template_hook()
+        self._stack = ExitStack()
+        for connection in connections.all():
+            self._stack.enter_context(connection.execute_wrapper(self.record_query))
+        _local.profiler = self
+        # Imported on use, only profiled requests pay for it
+        import cProfile
+
+        self.profile = cProfile.Profile()
+        self._started = perf_counter()
+        self.profile.enable()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profile.disable()
+        self.duration = (perf_counter() - self._started) * 1000
+        _local.profiler = None
+        self._stack.close()
+
+    def get_stats(self):
+        import io
+        import pstats
+
+        stream = io.StringIO()
+        pstats.Stats(self.profile, stream=stream).sort_stats(self.sort_by).print_stats(self.stats_lines)
+        return stream.getvalue()
+
+    def get_record(self, **extra):
+        record = {
+            "created": time(),
+            "duration": self.duration,
+            "queries": self.queries,
+            "query_time": sum(query["time"] for query in self.queries),
+            "templates": self.templates,
+            "stats": self.get_stats(),
+        }
+        record.update(extra)
+        return record
+
+
+def save_profile(record):
+    """Write `record` to the profile ring, dropping the oldest ones. Returns its id."""
+    directory = get_profile_dir()
+    os.makedirs(directory, exist_ok=True)
+    profile_id = "%d-%s" % (record["created"] * 1000, uuid4().hex[:8])
+    record["id"] = profile_id
+    with open(os.path.join(directory, "%s.json" % profile_id), "w") as f:
+        json.dump(record, f)
+    for stale_id in list_profile_ids()[routers_settings.PROFILE_RING_SIZE:]:
+        try:
+            os.remove(os.path.join(directory, "%s.json" % stale_id))
+        except OSError:
+            pass
+    return profile_id
+
+
+def list_profile_ids():
+    """Return the ids of the stored profiles, newest first."""
+    try:
+        names = os.listdir(get_profile_dir())
+    except OSError:
+        return []
+    ids = [name[:-5] for name in names if name.endswith(".json") and PROFILE_ID_RE.match(name[:-5])]
+    return sorted(ids, key=lambda profile_id: int(profile_id.split("-")[0]), reverse=True)
+
+
+def load_profile(profile_id):
+    """Return the stored profile `profile_id`, or None."""
+    if not PROFILE_ID_RE.match(profile_id):
+        return None
+    try:
+        with open(os.path.join(get_profile_dir(), "%s.json" % profile_id)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def profiled(action):
+    """
+    Decorate the viewset method serving `action`, so requests asking for it
+    by users allowed to are run under a `RequestProfiler`. The response
+    carries the id of the stored profile in an `X-Profile-Id` header.
+    """
+
+    def decorator(view_method):
+        @wraps(view_method)
+        def wrapper(viewset, request, *args, **kwargs):
+            if not wants_profile(request) or not viewset.permission_helper.user_can_profile(request.user):
+                return view_method(viewset, request, *args, **kwargs)
+            with RequestProfiler() as profiler:
+                response = view_method(viewset, request, *args, **kwargs)
+                if hasattr(response, "render") and not response.is_rendered:
+                    response.render()
+            record = profiler.get_record(
+                path=request.get_full_path(),
+                method=request.method,
+                user=str(request.user.pk),
+                label=viewset.opts.label_lower,
+                action=action,
+                status=response.status_code,
+            )
+            response["X-Profile-Id"] = save_profile(record)
+            return response
+
+        return wrapper
+
+    return decorator
@@ -12,19 +12,27 @@ For example, you might have a `urls.py` that looks something like this:
     router.register(AccountViewsetGroup)
     urlpatterns = router.urls
 
+Viewsets registered or unregistered after `router.urls` has been evaluated
+are patched into the same pattern list in place, so a URLconf holding on to
+`router.urls` picks them up without being reloaded.
+
 """
 
-from audioop import reverse
+from importlib.util import find_spec
 from inspect import isclass
 from logging import getLogger
+from threading import RLock
 
 from django.core.exceptions import ImproperlyConfigured
+from django.urls import reverse
 from django.urls.conf import include, path
+from django.urls.resolvers import URLResolver, get_ns_resolver, get_resolver
 from django.views import View
-from django_hookup import core as hookup
 
+from .menus import Menu
 from .settings import routers_settings
-from .views import BaseView
+from .sitemaps import RouterSitemap
+from .views import BaseView, ProfileDetailView, ProfileListView
 
 logger = getLogger("site_routers")
 
@@ -36,21 +44,66 @@ class DefaultIndexView(BaseView):
 class BaseRouter:
 
     namespace = None
+    menu_class = Menu
 
     def __init__(self):
         self.registry = []
+        self._lock = RLock()
+        self._viewset_urls = {}
         if self.namespace is None:
             raise ImproperlyConfigured(
                 "%s router namespace required!" % self.__class__.__name__,
             )
 
+    def get_viewset(self, viewset_class):
+        for viewset in self.registry:
+            if viewset.__class__ is viewset_class:
+                return viewset
+        return None
+
     def register(self, viewset_class):
-        viewset = viewset_class(router=self)
-        self.registry.append(viewset)
+        with self._lock:
+            viewset = viewset_class(router=self)
+            self.registry.append(viewset)
+            self.__dict__.pop("_menu", None)
+            if hasattr(self, "_urls"):
+                # Patch the compiled url list in place, after the other viewsets
+                position = sum(len(patterns) for patterns in self._viewset_urls.values())
+                patterns = self.get_viewset_urls(viewset)
+                self._urls[position:position] = patterns
+                self._viewset_urls[viewset] = patterns
+                self.invalidate_url_caches()
+        return viewset
+
+    def unregister(self, viewset_class):
+        with self._lock:
+            viewset = self.get_viewset(viewset_class)
+            if viewset is None:
+                raise ImproperlyConfigured("%s is not registered." % viewset_class.__name__)
+            self.registry.remove(viewset)
+            self.__dict__.pop("_menu", None)
+            if hasattr(self, "_urls"):
+                for pattern in self._viewset_urls.pop(viewset, []):
+                    self._urls.remove(pattern)
+                self.invalidate_url_caches()
 
-        # invalidate the urls cache
-        if hasattr(self, "_urls"):
-            del self._urls
+    @property
+    def menu(self):
+        """The menu tree of the registered viewsets, rebuilt when the registry changes."""
+        menu = self.__dict__.get("_menu")
+        if menu is None:
+            menu = self._menu = self.menu_class(self)
+        return menu
+
+    def get_menu(self, request):
+        """Return the menu groups visible to `request.user`."""
+        return self.menu.get_tree(request.user)
+
+    def get_viewset_urls(self, viewset):
+        """
+        Return the list of URL patterns serving a single registered viewset.
+        """
+        raise NotImplementedError("get_viewset_urls must be overridden")
 
     def get_urls(self):
         """
@@ -61,18 +114,62 @@ class BaseRouter:
     @property
     def urls(self):
         if not hasattr(self, "_urls"):
-            self._urls = self.get_urls()
+            with self._lock:
+                if not hasattr(self, "_urls"):
+                    self._urls = list(self.get_urls())
         return self._urls
 
+    def get_serving_resolvers(self, resolver=None):
+        """
+        Return the chain of resolvers, from the root URLconf down, whose
+        patterns include this router's url list. Resolvers that haven't
+        loaded their patterns yet have nothing cached and are skipped.
+        """
+        resolver = resolver or get_resolver()
+        # Only look at resolvers that loaded their patterns already: walking
+        # the others would import their URLconf, possibly the one calling
+        # `register()` right now
+        if "url_patterns" not in resolver.__dict__:
+            return []
+        if resolver.url_patterns is self._urls:
+            return [resolver]
+        for pattern in resolver.url_patterns:
+            if isinstance(pattern, URLResolver):
+                chain = self.get_serving_resolvers(pattern)
+                if chain:
+                    return [resolver] + chain
+        return []
+
+    def invalidate_url_caches(self):
+        """
+        Drop the reverse lookup tables of the resolvers serving this router,
+        instead of calling `clear_url_caches()`. Resolver instances and their
+        compiled patterns stay cached, only the affected reverse/namespace
+        dicts are rebuilt on the next `reverse()`.
+        """
+        for resolver in self.get_serving_resolvers():
+            resolver._reverse_dict.clear()
+            resolver._namespace_dict.clear()
+            resolver._app_dict.clear()
+            resolver._populated = False
+        # Namespaced lookups wrap the resolvers in throwaway copies
+        get_ns_resolver.cache_clear()
+
 
 class SimpleRouter(BaseRouter):
+    def get_viewset_urls(self, viewset):
+        return [path("%s" % viewset.get_prefix(), include(viewset.urls))]
+
     def get_urls(self):
         """
         Use the registered viewsets to generate a list of URL patterns.
         """
         urls = []
+        self._viewset_urls = {}
         for viewset in self.registry:
-            urls.append(path("%s" % viewset.get_prefix(), include(viewset.urls)))
+            patterns = self.get_viewset_urls(viewset)
+            self._viewset_urls[viewset] = patterns
+            urls.extend(patterns)
         return urls
 
 
@@ -85,6 +182,12 @@ class DefaultRouter(SimpleRouter):
     index_enabled = True
     index_view_name = "index"
     index_view_class = DefaultIndexView
+    # Opt-in: the sitemap lists every public inspect page of the router
+    sitemap_enabled = False
+    sitemap_class = RouterSitemap
+    profiles_enabled = True
+    profile_list_view_class = ProfileListView
+    profile_detail_view_class = ProfileDetailView
     site_view_hook_name = "REGISTER_SITE_VIEW"
     site_path_hook_name = "REGISTER_SITE_PATH"
 
@@ -105,9 +208,15 @@ class DefaultRouter(SimpleRouter):
         """
         return self.index_view_class
 
+    def get_hooks(self, hook_name):
+        # django_hookup is only needed once the url conf is compiled
+        from django_hookup import core as hookup
+
+        return hookup.get_hooks(hook_name)
+
     def get_hooked_views(self):
         # Get registered custom admin view
-        funcs = hookup.get_hooks(self.site_view_hook_name)
+        funcs = self.get_hooks(self.site_view_hook_name)
         urls = []
         for func in funcs:
             url_path, view, name = func()
@@ -124,7 +233,7 @@ class DefaultRouter(SimpleRouter):
 
     def get_hooked_paths(self):
         urls = []
-        funcs = hookup.get_hooks(self.site_path_hook_name)
+        funcs = self.get_hooks(self.site_path_hook_name)
         for func in funcs:
             urls.append(func())
         return urls
@@ -143,22 +252,76 @@ class DefaultRouter(SimpleRouter):
                     name=self.index_view_name,
                 ),
             )
-        urls += self.get_hooked_views()
-        urls += self.get_hooked_paths()
+        self._site_urls = self.get_sitemap_urls() + self.get_profile_urls()
+        urls += self._site_urls
+        self._hooked_urls = self.get_hooked_views() + self.get_hooked_paths()
+        urls += self._hooked_urls
         return urls
 
+    def get_sitemap_urls(self):
+        if not self.sitemap_enabled:
+            return []
+        sitemap = self.sitemap_class(self)
+        return [
+            path("sitemap.xml", sitemap.index_view, name="%s_sitemap" % self.namespace),
+            path(
+                "sitemap-<str:section>-<int:page>.xml",
+                sitemap.section_view,
+                name="%s_sitemap_section" % self.namespace,
+            ),
+        ]
+
+    def get_profile_urls(self):
+        if not self.profiles_enabled:
+            return []
+        return [
+            path(
+                "_profiles/",
+                self.profile_list_view_class.as_view(router=self, title="Profiles"),
+                name="%s_profiles" % self.namespace,
+            ),
+            path(
+                "_profiles/<str:profile_id>/",
+                self.profile_detail_view_class.as_view(router=self, title="Profile"),
+                name="%s_profile" % self.namespace,
+            ),
+        ]
+
+    def reload_hooked_urls(self):
+        """
+        Re-read the site view and path hooks, e.g. after a plugin registered
+        new ones, and patch them into the compiled url list in place.
+        """
+        with self._lock:
+            if not hasattr(self, "_urls"):
+                return
+            for pattern in self._hooked_urls:
+                self._urls.remove(pattern)
+            position = sum(len(patterns) for patterns in self._viewset_urls.values())
+            if self.index_enabled:
+                position += 1
+            position += len(self._site_urls)
+            self._hooked_urls = self.get_hooked_views() + self.get_hooked_paths()
+            self._urls[position:position] = self._hooked_urls
+            self.invalidate_url_caches()
+
 
 class AuthenticationRouter(SimpleRouter):
-    def get_urls(self):
-        try:
-            from allauth.urls import urlpatterns
 
-            urls = super().get_urls()
-            urls += list(urlpatterns)
+    namespace = "authentication"
+    urlconf = "allauth.urls"
+
+    def get_urls(self):
+        """
+        Include the allauth url conf by its dotted path, so it is imported by
+        the resolver on first use instead of when the patterns are built.
+        """
+        urls = super().get_urls()
+        if find_spec(self.urlconf.split(".")[0]) is None:
+            logger.error("%s can't be found, authentication urls are disabled.", self.urlconf)
             return urls
-        except Exception as err:
-            logger.error(err)
-            return []
+        urls.append(path("", include(self.urlconf)))
+        return urls
 
 
 class Site(DefaultRouter):
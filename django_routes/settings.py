@@ -8,7 +8,7 @@ import os
 from typing import Any, Dict
 
 from django.conf import settings
-from django.test.signals import setting_changed
+from django.core.signals import setting_changed
 from django.utils.module_loading import import_string
 
 SETTINGS_DOC = "https://gitlab.com/sasriawesome/simpel"
@@ -19,6 +19,11 @@ SIMPEL_SITES_DEFAULTS: Dict[str, Any] = {
     "SITE_HEADER": os.getenv("SITE_HEADER", "Simpel Admin"),
     "INDEX_TITLE": "Welcome to Simpel Site",
     "INDEX_TEMPLATE": "admin/app_index.html",
+    "CACHE_ALIAS": "default",
+    "READ_DATABASE": None,
+    "READ_AFTER_WRITE_SECONDS": 10,
+    "PROFILE_DIR": None,
+    "PROFILE_RING_SIZE": 50,
 }
 
 # List of settings that may be in string import notation.
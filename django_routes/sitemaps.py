@@ -0,0 +1,156 @@
+"""
+Streaming sitemaps of the public inspect pages of a router.
+
+`sitemap.xml` is a sitemap index pointing to one or more
+`sitemap-<model label>-<page>.xml` files per public viewset, split at
+`limit` urls per file. Each file holds a pk range, whose boundaries the
+index computes and caches, so a file reads its rows through the pk index
+instead of an OFFSET. Rows are read with `values_list().iterator()` and
+urls are built from a template reversed once per viewset, and the xml is
+streamed, so memory stays flat on tables with millions of rows.
+
+Routers serve it once `sitemap_enabled` is set.
+"""
+from django.contrib.auth.models import AnonymousUser
+from django.http import Http404, StreamingHttpResponse
+from django.urls import reverse
+from django.utils.html import escape
+
+from .cache import get_cache, make_key
+from .helpers.url import quote
+
+PK_PLACEHOLDER = "ROUTESPK"
+
+XML_HEADER = '<?xml version="1.0" encoding="UTF-8"?>\n'
+SITEMAP_NS = "http://www.sitemaps.org/schemas/sitemap/0.9"
+
+INDEX_HEADER = '%s<sitemapindex xmlns="%s">\n' % (XML_HEADER, SITEMAP_NS)
+INDEX_FOOTER = "</sitemapindex>\n"
+URLSET_HEADER = '%s<urlset xmlns="%s">\n' % (XML_HEADER, SITEMAP_NS)
+URLSET_FOOTER = "</urlset>\n"
+
+
+def format_lastmod(value):
+    if value is None:
+        return ""
+    return "<lastmod>%s</lastmod>" % value.isoformat()
+
+
+class RouterSitemap:
+    limit = 50000
+    chunk_size = 2000
+    boundaries_cache_timeout = 3600
+    content_type = "application/xml"
+
+    def __init__(self, router):
+        self.router = router
+
+    def get_sections(self):
+        """Return the public inspect viewsets, by section name."""
+        return {
+            viewset.opts.label_lower: viewset
+            for viewset in self.router.registry
+            if viewset.has_view("inspect_view") and viewset.inspect_public
+        }
+
+    def get_section(self, name):
+        try:
+            return self.get_sections()[name]
+        except KeyError:
+            raise Http404("No sitemap section %s" % name)
+
+    def get_section_queryset(self, viewset):
+        """
+        Return the rows listed in the section of `viewset`: the ones an
+        anonymous user may open, as the permission helper row rules still
+        apply to public inspect pages.
+        """
+        queryset = viewset.permission_helper.filter_queryset(AnonymousUser(), viewset.get_read_queryset())
+        return queryset.order_by("pk")
+
+    def compute_boundaries(self, viewset):
+        """
+        Return the last pk of every section page but the last one, walking
+        the pk index from one boundary to the next.
+        """
+        queryset = self.get_section_queryset(viewset).values_list("pk", flat=True)
+        offset = self.limit - 1
+        boundaries = []
+        while True:
+            rows = queryset.filter(pk__gt=boundaries[-1]) if boundaries else queryset
+            # The last pk of the page, and the first of the next one if any
+            pks = list(rows[offset:][:2])
+            if len(pks) < 2:
+                return boundaries
+            boundaries.append(pks[0])
+
+    def get_boundaries(self, viewset, refresh=False):
+        """
+        Return the section page boundaries of `viewset`, from the cache unless
+        `refresh` is set. The index refreshes them, so the pages it lists and
+        the rows they hold agree.
+        """
+        cache = get_cache()
+        key = make_key("sitemap", self.router.namespace, viewset.opts.label_lower)
+        boundaries = None if refresh else cache.get(key)
+        if boundaries is None:
+            boundaries = self.compute_boundaries(viewset)
+            cache.set(key, boundaries, self.boundaries_cache_timeout)
+        return boundaries
+
+    def get_page_queryset(self, viewset, page):
+        """Return the rows of section `page`, as a pk range."""
+        boundaries = self.get_boundaries(viewset)
+        queryset = self.get_section_queryset(viewset)
+        if page > len(boundaries) + 1:
+            return queryset.none()
+        if page > 1:
+            queryset = queryset.filter(pk__gt=boundaries[page - 2])
+        if page <= len(boundaries):
+            queryset = queryset.filter(pk__lte=boundaries[page - 1])
+        return queryset
+
+    def get_url_template(self, viewset):
+        """Reverse the inspect url once, leaving a `%s` slot for the pk."""
+        url = viewset.url_helper.get_url("inspect", pk=PK_PLACEHOLDER)
+        return url.replace("%", "%%").replace(PK_PLACEHOLDER, "%s")
+
+    def get_section_url(self, name, page):
+        return reverse("%s_sitemap_section" % self.router.namespace, kwargs={"section": name, "page": page})
+
+    def iter_index(self, request):
+        yield INDEX_HEADER
+        for name, viewset in self.get_sections().items():
+            pages = len(self.get_boundaries(viewset, refresh=True)) + 1
+            for page in range(1, pages + 1):
+                url = request.build_absolute_uri(self.get_section_url(name, page))
+                yield "<sitemap><loc>%s</loc></sitemap>\n" % escape(url)
+        yield INDEX_FOOTER
+
+    def iter_section(self, request, viewset, page):
+        base = request.build_absolute_uri("/")[:-1]
+        template = escape(base + self.get_url_template(viewset))
+        lastmod_field = getattr(viewset, "sitemap_lastmod_field", None)
+        fields = ["pk", lastmod_field] if lastmod_field else ["pk"]
+        rows = self.get_page_queryset(viewset, page).values_list(*fields)
+        yield URLSET_HEADER
+        lines = []
+        for row in rows.iterator(chunk_size=self.chunk_size):
+            pk = row[0]
+            loc = template % escape(quote(pk) if isinstance(pk, str) else pk)
+            lines.append("<url><loc>%s</loc>%s</url>\n" % (loc, format_lastmod(row[1]) if lastmod_field else ""))
+            if len(lines) >= self.chunk_size:
+                yield "".join(lines)
+                lines = []
+        if lines:
+            yield "".join(lines)
+        yield URLSET_FOOTER
+
+    def index_view(self, request):
+        return StreamingHttpResponse(self.iter_index(request), content_type=self.content_type)
+
+    def section_view(self, request, section, page):
+        viewset = self.get_section(section)
+        if page < 1:
+            raise Http404("Invalid sitemap page")
+        return StreamingHttpResponse(self.iter_section(request, viewset, page), content_type=self.content_type)
@@ -0,0 +1,93 @@
+"""
+Namespace independent viewset metadata.
+
+Every router registering a viewset class gets its own viewset instance, but
+everything derived from the model alone (prefix, permission codenames,
+template candidates, field plans) is the same for all of them. That part
+lives in a `ViewSetSpec`, built once per viewset class and shared, so memory
+no longer grows with model count x site count.
+"""
+from threading import Lock
+from types import MappingProxyType
+
+_spec_registry = {}
+_spec_lock = Lock()
+
+
+class ViewSetSpec:
+    """Immutable, slotted metadata shared by every instance of a viewset class."""
+
+    __slots__ = (
+        "model",
+        "opts",
+        "app_label",
+        "model_name",
+        "label",
+        "prefix",
+        "permission_helper",
+        "perm_codenames",
+        "template_patterns",
+        "concrete_field_names",
+        "inspect_view_fields",
+    )
+
+    def __init__(self, viewset_class, permission_helper_class=None):
+        model = viewset_class.model
+        opts = model._meta
+        app_label = opts.app_label.lower()
+        model_name = opts.model_name.lower()
+        permission_helper = (permission_helper_class or viewset_class.permission_helper_class)(model)
+        exclude = getattr(viewset_class, "inspect_view_fields_exclude", ())
+        values = {
+            "model": model,
+            "opts": opts,
+            "app_label": app_label,
+            "model_name": model_name,
+            "label": opts.label,
+            "prefix": "%s/%s/" % (str(opts.app_label).replace("_", "-"), opts.model_name),
+            "permission_helper": permission_helper,
+            "perm_codenames": MappingProxyType(dict(permission_helper.perm_codenames)),
+            # Namespace and action are filled in by `get_templates`
+            "template_patterns": (
+                "%%s/%s/%s/%%s.html" % (app_label, model_name),
+                "%%s/%s/%%s.html" % model_name,
+                "%s/%s.html",
+            ),
+            "concrete_field_names": tuple(f.name for f in opts.concrete_fields),
+            "inspect_view_fields": tuple(
+                f.name
+                for f in opts.get_fields()
+                if f.name not in exclude
+                and f.concrete
+                and (not f.is_relation or (not f.auto_created and f.related_model))
+            ),
+        }
+        for name, value in values.items():
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("%s is immutable" % self.__class__.__name__)
+
+    def __delattr__(self, name):
+        raise AttributeError("%s is immutable" % self.__class__.__name__)
+
+    def __repr__(self):
+        return "<%s: %s>" % (self.__class__.__name__, self.label)
+
+    def get_templates(self, namespace, action):
+        return [pattern % (namespace, action) for pattern in self.template_patterns]
+
+
+def get_viewset_spec(viewset_class, permission_helper_class=None):
+    """
+    Return the shared `ViewSetSpec` of `viewset_class` using
+    `permission_helper_class`, building it on first use.
+    """
+    key = (viewset_class, permission_helper_class)
+    spec = _spec_registry.get(key)
+    if spec is None:
+        with _spec_lock:
+            spec = _spec_registry.get(key)
+            if spec is None:
+                spec = _spec_registry[key] = ViewSetSpec(viewset_class, permission_helper_class)
+    return spec
@@ -1,7 +1,10 @@
 from django.apps import apps
 from django.db import models
 from django.template import Library
+from django.templatetags.static import static
+from django.utils.html import format_html, format_html_join
 
+from django_routes.assets import get_bundle, get_viewset_assets
 from django_routes.helpers import URLHelper
 
 register = Library()
@@ -24,3 +27,29 @@ def object_url(context, namespace, instance, **kwargs):
         helper = URLHelper(namespace, model)
         _url_helper_registry[slug] = helper
     return helper.get_url(**kwargs)
+
+
+@register.simple_tag
+def routes_assets(viewset, action, asset_type):
+    """
+    Render the extra css or js of a viewset action, as a single bundle built by
+    `routes_bundle_assets`, or as the individual files in DEBUG mode.
+    """
+    tag = '<link rel="stylesheet" href="{}">' if asset_type == "css" else '<script src="{}"></script>'
+    bundle = get_bundle(viewset, action, asset_type)
+    if bundle:
+        return format_html(tag, static(bundle))
+    paths = get_viewset_assets(viewset, action, asset_type)
+    return format_html_join("\n", tag, ((path if "//" in path else static(path),) for path in paths))
+
+
+@register.simple_tag(takes_context=True)
+def routes_menu(context, router=None):
+    """
+    Return the menu groups of `router` (defaults to the router of the current
+    viewset) visible to the current user, e.g. `{% routes_menu as menu %}`.
+    """
+    request = context["request"]
+    if router is None:
+        router = context["view"].viewset.router
+    return router.get_menu(request)
@@ -0,0 +1,125 @@
+"""
+Database statement timeouts.
+
+`statement_timeout()` caps every statement run inside it, using the
+backend's own mechanism: `statement_timeout` on PostgreSQL,
+`max_execution_time` (`max_statement_time` on MariaDB) on MySQL and a
+progress handler on SQLite. A statement running past it raises
+`QueryTimeout` instead of holding the worker.
+"""
+from contextlib import ExitStack, contextmanager
+from logging import getLogger
+from time import monotonic
+
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections, transaction
+
+logger = getLogger("engine")
+
+# SQLite runs the progress handler every that many virtual machine steps
+SQLITE_PROGRESS_STEPS = 1000
+
+
+class QueryTimeout(Exception):
+    """A statement was cancelled by the database statement timeout."""
+
+
+def is_timeout_error(connection, error):
+    if connection.vendor == "postgresql":
+        return getattr(error.__cause__, "pgcode", None) == "57014"
+    if connection.vendor == "mysql":
+        # ER_QUERY_TIMEOUT, and ER_STATEMENT_TIMEOUT on MariaDB
+        return bool(error.args) and error.args[0] in (3024, 1969)
+    if connection.vendor == "sqlite":
+        return "interrupted" in str(error)
+    return False
+
+
+@contextmanager
+def _sqlite_timeout(connection, seconds):
+    deadline = [None]
+
+    def progress():
+        return 1 if deadline[0] is not None and monotonic() > deadline[0] else 0
+
+    def execute(execute, sql, params, many, context):
+        # The deadline restarts with each statement
+        deadline[0] = monotonic() + seconds
+        return execute(sql, params, many, context)
+
+    connection.ensure_connection()
+    connection.connection.set_progress_handler(progress, SQLITE_PROGRESS_STEPS)
+    try:
+        with connection.execute_wrapper(execute):
+            yield
+    finally:
+        if connection.connection is not None:
+            connection.connection.set_progress_handler(None, 0)
+
+
+@contextmanager
+def _session_timeout(connection, seconds):
+    if connection.vendor == "postgresql":
+        set_sql = "SET statement_timeout = %s" % int(seconds * 1000)
+        reset_sql = "RESET statement_timeout"
+    elif connection.mysql_is_mariadb:
+        set_sql = "SET SESSION max_statement_time = %s" % float(seconds)
+        reset_sql = "SET SESSION max_statement_time = DEFAULT"
+    else:
+        set_sql = "SET SESSION max_execution_time = %s" % int(seconds * 1000)
+        reset_sql = "SET SESSION max_execution_time = DEFAULT"
+    with connection.cursor() as cursor:
+        cursor.execute(set_sql)
+    try:
+        yield
+    finally:
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(reset_sql)
+        except DatabaseError:
+            # The connection is unusable anyway, it won't be reused
+            logger.exception("Can't reset the statement timeout of %s", connection.alias)
+
+
+@contextmanager
+def _apply_timeout(connection, seconds):
+    if connection.vendor == "sqlite":
+        manager = _sqlite_timeout(connection, seconds)
+    elif connection.vendor in ("postgresql", "mysql"):
+        manager = _session_timeout(connection, seconds)
+    else:
+        logger.debug("Statement timeouts aren't supported by %s", connection.vendor)
+        yield
+        return
+    connection.routes_statement_timeout = seconds
+    try:
+        with manager:
+            yield
+    finally:
+        connection.routes_statement_timeout = None
+
+
+@contextmanager
+def statement_timeout(seconds, using=None):
+    """
+    Cap statements run on the `using` database to `seconds`, raising
+    `QueryTimeout` from the ones cancelled. Nested blocks keep the timeout
+    of the outermost one but still translate errors, and run in a savepoint
+    when inside a transaction, so a caught timeout leaves it usable.
+    """
+    connection = connections[using or DEFAULT_DB_ALIAS]
+    active = getattr(connection, "routes_statement_timeout", None)
+    if not seconds and not active:
+        yield
+        return
+    with ExitStack() as stack:
+        if not active:
+            stack.enter_context(_apply_timeout(connection, seconds))
+        if connection.in_atomic_block:
+            stack.enter_context(transaction.atomic(using=connection.alias))
+        try:
+            yield
+        except DatabaseError as err:
+            if is_timeout_error(connection, err):
+                message = "Statement cancelled after %ss on %s" % (active or seconds, connection.alias)
+                raise QueryTimeout(message) from err
+            raise
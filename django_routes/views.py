@@ -1,15 +1,25 @@
+import json
 import logging
 
 from django.contrib import messages
-from django.contrib.admin.utils import quote
+from django.core.exceptions import EmptyResultSet, PermissionDenied, ValidationError
+from django.core.paginator import InvalidPage
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import router as db_router
+from django.db.models import Count
+from django.http import Http404, HttpResponse, StreamingHttpResponse
 from django.shortcuts import redirect
+from django.template.loader import render_to_string
+from django.utils.cache import patch_vary_headers
 
 # from django.contrib.auth.decorators import login_required
 # from django.core.exceptions import PermissionDenied
 # from django.http.response import HttpResponseRedirect
 # from django.utils.decorators import method_decorator
 from django.utils.functional import cached_property
-from django.utils.translation import gettext_lazy as _
+from django.utils.html import format_html
+from django.utils.safestring import mark_safe
+from django.utils.translation import get_language, gettext_lazy as _
 from django.views.generic.base import ContextMixin, TemplateResponseMixin, View
 
 # from django.views.generic.detail import BaseDetailView, SingleObjectMixin
@@ -19,7 +29,17 @@ from django.views.generic.detail import (
     SingleObjectTemplateResponseMixin,
 )
 from django.views.generic.list import MultipleObjectMixin
-from django_filters.views import FilterMixin
+
+from .cache import coalesce, get_model_version, hash_key, make_key
+from .facets import build_facet, count_facet
+from .helpers.url import quote
+from .paginator import UncountedPaginator
+from .profiling import list_profile_ids, load_profile
+from .tables import ValuesTable
+from .timeouts import QueryTimeout, statement_timeout
+
+# Resolved on first use, see `get_orjson`
+_orjson = False
 
 # from django_hookup import core as hookup
 
@@ -29,6 +49,79 @@ after_inspect_hook_name = "AFTER_INSPECT_VIEW_HOOK"
 logger = logging.getLogger("engine")
 
 
+def get_orjson():
+    """Return the orjson module when installed, None otherwise."""
+    global _orjson
+    if _orjson is False:
+        try:
+            import orjson as _orjson
+        except ImportError:
+            _orjson = None
+    return _orjson
+
+
+def dumps_json(data):
+    """Serialize `data` with orjson when installed, falling back to the stdlib encoder."""
+    orjson = get_orjson()
+    if orjson is not None:
+        return orjson.dumps(data, default=DjangoJSONEncoder().default)
+    return json.dumps(data, cls=DjangoJSONEncoder).encode()
+
+
+class FilterMixin:
+    """
+    Handle the django-filter FilterSet of a list view, the same way as
+    `django_filters.views.FilterMixin`. django-filter itself is only
+    imported when a filterset class has to be generated.
+    """
+
+    filterset_class = None
+    filterset_fields = None
+    strict = True
+
+    def get_filterset_class(self):
+        if self.filterset_class:
+            return self.filterset_class
+        from django_filters.filterset import filterset_factory
+
+        return filterset_factory(model=self.model, fields=self.filterset_fields)
+
+    def get_filterset(self, filterset_class):
+        kwargs = self.get_filterset_kwargs(filterset_class)
+        return filterset_class(**kwargs)
+
+    def get_filterset_kwargs(self, filterset_class):
+        return {
+            "data": self.request.GET or None,
+            "request": self.request,
+            "queryset": self.get_queryset(),
+        }
+
+    def get_strict(self):
+        return self.strict
+
+
+class JSONResponseMixin:
+    """
+    Serve `application/json` instead of the rendered template when the client
+    asks for it, through the `Accept` header or a `format=json` query param.
+    """
+
+    json_enabled = True
+    json_content_type = "application/json"
+
+    def wants_json(self, request):
+        if not self.json_enabled or request.method not in ("GET", "HEAD"):
+            return False
+        if request.GET.get("format") == "json":
+            return True
+        accept = request.headers.get("Accept", "")
+        return self.json_content_type in accept and "text/html" not in accept
+
+    def render_to_json_response(self, data, status=200):
+        return HttpResponse(dumps_json(data), content_type=self.json_content_type, status=status)
+
+
 class SiteContext(ContextMixin):
     title = ""
     subtitle = ""
@@ -81,9 +174,65 @@ class BaseView(TemplateResponseMixin, SiteContext, View):
         return self.render_to_response(context)
 
 
+class ProfileView(JSONResponseMixin, BaseView):
+    """
+    Base of the router pages listing and showing the stored request profiles.
+    Profiles are shown to users the viewset they were taken on lets profile.
+    """
+
+    router = None
+
+    def get_viewset(self, label):
+        for viewset in self.router.registry:
+            if getattr(viewset, "opts", None) is not None and viewset.opts.label_lower == label:
+                return viewset
+        return None
+
+    def user_can_view(self, user, record):
+        viewset = self.get_viewset(record.get("label"))
+        return viewset is not None and viewset.permission_helper.user_can_profile(user)
+
+
+class ProfileListView(ProfileView):
+    template_name = "profiles.html"
+    summary_fields = ("id", "created", "path", "method", "label", "action", "status", "duration", "query_time")
+
+    def get_profiles(self, request):
+        profiles = []
+        for profile_id in list_profile_ids():
+            record = load_profile(profile_id)
+            if record is not None and self.user_can_view(request.user, record):
+                record["query_count"] = len(record["queries"])
+                profiles.append({name: record.get(name) for name in self.summary_fields + ("query_count",)})
+        return profiles
+
+    def get(self, request, *args, **kwargs):
+        profiles = self.get_profiles(request)
+        if not profiles and not request.user.is_staff:
+            raise PermissionDenied
+        if self.wants_json(request):
+            return self.render_to_json_response({"results": profiles})
+        return self.render_to_response(self.get_context_data(profiles=profiles))
+
+
+class ProfileDetailView(ProfileView):
+    template_name = "profile.html"
+
+    def get(self, request, profile_id, *args, **kwargs):
+        record = load_profile(profile_id)
+        if record is None:
+            raise Http404(_("No profile %s") % profile_id)
+        if not self.user_can_view(request.user, record):
+            raise PermissionDenied
+        if self.wants_json(request):
+            return self.render_to_json_response(record)
+        return self.render_to_response(self.get_context_data(profile=record))
+
+
 class SiteView(BaseView):
     viewset = None
     model = None
+    action_context = None
 
     def __init__(self, viewset, **kwargs):
         self.viewset = viewset
@@ -100,6 +249,7 @@ class SiteView(BaseView):
             {
                 "model": self.model,
                 "opts": self.opts,
+                "action_context": self.action_context,
             }
         )
         return context
@@ -113,9 +263,8 @@ class ModelView(SiteView):
         super().__init__(viewset, **kwargs)
 
 
-class ListView(FilterMixin, MultipleObjectMixin, ModelView):
+class ListView(JSONResponseMixin, FilterMixin, MultipleObjectMixin, ModelView):
     def __init__(self, viewset, **kwargs):
-        self.queryset = viewset.get_queryset()
         self.ordering = viewset.get_ordering()
         self.paginator_class = viewset.get_paginator_class()
         self.paginate_by = viewset.paginate_by
@@ -128,14 +277,356 @@ class ListView(FilterMixin, MultipleObjectMixin, ModelView):
     def index_url(self):
         return self.url_helper.get_url("index")
 
+    def get_queryset(self):
+        return self.viewset.get_read_queryset(self.request)
+
+    def get_cached_pks(self, queryset):
+        """
+        Return the ordered pk list of `queryset` from the filter result cache,
+        or None when the result has more rows than `filter_pk_cache_max`.
+        The key holds the compiled SQL, which covers the normalized filter
+        state, ordering and row permissions, and the versions of the model
+        and of the related models the filters read.
+        """
+        try:
+            sql = str(queryset.query)
+        except EmptyResultSet:
+            return None
+        viewset = self.viewset
+        versions = [get_model_version(self.model)]
+        filterset = getattr(self, "filterset", None)
+        if filterset is not None:
+            related_models = viewset.get_filter_related_models(filterset.__class__)
+            versions += [get_model_version(model) for model in related_models]
+        key = make_key("pks", queryset.db, self.opts.label_lower, hash_key((versions, sql)))
+
+        def get_pks():
+            pks = list(queryset.values_list("pk", flat=True)[: viewset.filter_pk_cache_max + 1])
+            return pks if len(pks) <= viewset.filter_pk_cache_max else False
+
+        pks = coalesce(key, get_pks, viewset.filter_pk_cache_timeout)
+        return pks if pks is not False else None
+
+    def paginate_queryset(self, queryset, page_size):
+        """
+        With `filter_pk_cache` enabled, paginate the cached pk list and load
+        the page with a single `pk__in` lookup. The queryset ordering is kept,
+        so the page rows come back in the cached order.
+        """
+        pks = self.get_cached_pks(queryset) if self.viewset.filter_pk_cache else None
+        if pks is None:
+            try:
+                with statement_timeout(self.viewset.get_statement_timeout("index"), queryset.db):
+                    return super().paginate_queryset(queryset, page_size)
+            except QueryTimeout:
+                logger.warning("%s: count timed out, paginating without it", self.opts.label)
+                return self.paginate_uncounted(queryset, page_size)
+        paginator, page, page_pks, is_paginated = super().paginate_queryset(pks, page_size)
+        page.object_list = queryset.filter(pk__in=list(page_pks))
+        return paginator, page, page.object_list, is_paginated
+
+    def paginate_uncounted(self, queryset, page_size):
+        """Paginate `queryset` with previous/next links only, as counting it timed out."""
+        paginator = UncountedPaginator(queryset, page_size, allow_empty_first_page=self.get_allow_empty())
+        page_number = self.kwargs.get(self.page_kwarg) or self.request.GET.get(self.page_kwarg) or 1
+        try:
+            page = paginator.page(1 if page_number == "last" else page_number)
+        except InvalidPage as err:
+            raise Http404(
+                _("Invalid page (%(page_number)s): %(message)s") % {"page_number": page_number, "message": err}
+            )
+        return paginator, page, page.object_list, page.has_other_pages()
+
     def get_template_names(self):
         return self.viewset.get_templates(action="index")
 
+    aggregated_count = None
+    aggregate_count_alias = "_routes_count"
+
+    def get_aggregates(self, queryset):
+        """
+        Compute the viewset `list_aggregates` over the whole filtered
+        `queryset` in a single `aggregate()` query, returning a dict of field
+        name to (label, value) pairs, or None. The query counts the rows too,
+        and that count is reused by the paginator. A timed out aggregation
+        only drops the aggregates.
+        """
+        declared = self.viewset.get_list_aggregates(self.request)
+        if not declared:
+            return None
+        expressions = {self.aggregate_count_alias: Count("pk")}
+        for name, funcs in declared.items():
+            for func in funcs:
+                expressions["%s__%s" % (name, func.name.lower())] = func(name)
+        try:
+            with statement_timeout(self.viewset.get_statement_timeout("index"), queryset.db):
+                result = queryset.order_by().aggregate(**expressions)
+        except QueryTimeout:
+            logger.warning("%s: aggregates timed out", self.opts.label)
+            return None
+        self.aggregated_count = result.pop(self.aggregate_count_alias)
+        return {
+            name: [(func.name.title(), result["%s__%s" % (name, func.name.lower())]) for func in funcs]
+            for name, funcs in declared.items()
+        }
+
+    def get_paginator(self, queryset, per_page, orphans=0, allow_empty_first_page=True, **kwargs):
+        paginator = super().get_paginator(queryset, per_page, orphans, allow_empty_first_page, **kwargs)
+        if self.aggregated_count is not None:
+            # Counted along the aggregates already
+            paginator.__dict__["count"] = self.aggregated_count
+        return paginator
+
+    def get_filter_keys(self, filter_name, filter_):
+        """
+        Return the query params of a filter: its name, or one param per
+        widget suffix for range style filters (`price_min`, `price_max`).
+        """
+        suffixes = getattr(filter_.field.widget, "suffixes", None)
+        if not suffixes:
+            return [filter_name]
+        return ["%s_%s" % (filter_name, suffix) if suffix else filter_name for suffix in suffixes]
+
+    def get_facet_queryset(self, name):
+        """
+        Return the list filtered by every active filter but those of field
+        `name`, so the facet of a filter counts its other choices too.
+        """
+        filterset = self.filterset
+        data = self.request.GET.copy()
+        for filter_name, filter_ in filterset.filters.items():
+            if filter_.field_name == name:
+                for key in self.get_filter_keys(filter_name, filter_):
+                    data.pop(key, None)
+        if len(data) == len(self.request.GET):
+            return self.object_list
+        facet_filterset = filterset.__class__(data=data or None, request=self.request, queryset=self.get_queryset())
+        if not facet_filterset.is_bound or facet_filterset.is_valid() or not self.get_strict():
+            return facet_filterset.qs
+        return facet_filterset.queryset.none()
+
+    def get_facets(self):
+        """
+        Return the value counts of the viewset facet fields under the current
+        filter state, one grouped query per facet. Results are cached by the
+        filtered list SQL, which holds the filter state and row permissions,
+        and by the versions of the counted models.
+        """
+        viewset = self.viewset
+        fields = viewset.get_facet_fields(self.request)
+        if not fields or getattr(self, "filterset", None) is None:
+            return None
+        try:
+            sql = str(self.object_list.query)
+        except EmptyResultSet:
+            return None
+        versions = [get_model_version(self.model)]
+        versions += [get_model_version(field.related_model) for name, field in fields if field.is_relation]
+        names = [name for name, field in fields]
+        key = make_key(
+            "facets",
+            viewset.namespace,
+            self.opts.label_lower,
+            hash_key((versions, sql, names, viewset.list_facets_top_k, get_language())),
+        )
+        empty_value_display = getattr(viewset, "empty_value_display", "-")
+
+        def compute():
+            facets = []
+            for name, field in fields:
+                queryset = self.get_facet_queryset(name)
+                rows, truncated = count_facet(queryset, field, viewset.list_facets_top_k)
+                facets.append(build_facet(name, field, rows, truncated, empty_value_display, queryset.db))
+            return facets
+
+        try:
+            with statement_timeout(viewset.get_statement_timeout("index"), self.object_list.db):
+                facets = coalesce(key, compute, viewset.list_facets_cache_timeout)
+        except QueryTimeout:
+            logger.warning("%s: facet counts timed out", self.opts.label)
+            return None
+        for facet in facets:
+            # Booleans are posted as true/false
+            selected = {value.lower() for value in self.request.GET.getlist(facet["name"])}
+            for choice in facet["choices"]:
+                choice["selected"] = str(choice["value"]).lower() in selected
+        return facets
+
     def get_context_data(self, **kwargs):
+        aggregates = self.get_aggregates(self.object_list)
         context = super().get_context_data(**kwargs)
+        context["aggregates"] = aggregates
+        context["facets"] = self.get_facets()
         return context
 
+    fragment_header = "X-Fragment"
+    fragment_param = "_fragment"
+
+    def is_fragment_request(self, request):
+        """
+        Return True when only the table body and pager are requested, e.g.
+        by a page, sort or filter change made from the already rendered list.
+        """
+        return bool(request.headers.get(self.fragment_header) or request.GET.get(self.fragment_param))
+
+    def get_fragment_context_data(self):
+        """
+        Return the context of the fragment template: the current page only,
+        without the site context, menus, assets or filter form.
+        """
+        queryset = self.object_list
+        context = {
+            "view": self,
+            "paginator": None,
+            "page_obj": None,
+            "is_paginated": False,
+            "object_list": queryset,
+            "aggregates": self.get_aggregates(queryset),
+        }
+        page_size = self.get_paginate_by(queryset)
+        if page_size:
+            paginator, page, queryset, is_paginated = self.paginate_queryset(queryset, page_size)
+            context.update(
+                {
+                    "paginator": paginator,
+                    "page_obj": page,
+                    "is_paginated": is_paginated,
+                    "object_list": queryset,
+                }
+            )
+        return context
+
+    def render_fragment_response(self):
+        response = self.response_class(
+            request=self.request,
+            template=self.viewset.get_index_fragment_template(),
+            context=self.get_fragment_context_data(),
+            using=self.template_engine,
+        )
+        patch_vary_headers(response, (self.fragment_header,))
+        return response
+
+    def get_json_data(self, request):
+        """
+        Return the current page as plain dicts, read through `.values()` so no
+        model instance is built and no template is rendered.
+        """
+        fields = self.viewset.get_index_json_fields(request)
+        aggregates = self.get_aggregates(self.object_list)
+        queryset = self.object_list.values(*fields)
+        page_size = self.get_paginate_by(queryset)
+        if not page_size:
+            return {"count": None, "aggregates": aggregates, "results": list(queryset)}
+        paginator, page, object_list, is_paginated = self.paginate_queryset(queryset, page_size)
+        return {
+            "aggregates": aggregates,
+            "count": paginator.count,
+            "num_pages": paginator.num_pages,
+            "page": page.number,
+            "next": page.next_page_number() if page.has_next() else None,
+            "previous": page.previous_page_number() if page.has_previous() else None,
+            "results": list(object_list),
+        }
+
+    def is_render_cacheable(self, request):
+        """
+        Return True when the rendered page can be shared through the render
+        cache: anonymous HTML requests only, as pages of signed in users hold
+        their menus, buttons and CSRF tokens. Streamed pages aren't cached.
+        """
+        if not self.viewset.index_render_cache or request.user.is_authenticated:
+            return False
+        return not self.wants_json(request) and not self.is_streaming_request(request)
+
+    def is_streaming_request(self, request):
+        """Return True when the HTML page is streamed, see `TableView.render_streaming_response`."""
+        return self.viewset.index_streaming and not self.wants_json(request) and not self.is_fragment_request(request)
+
+    def render_streaming_response(self, context):
+        """Only tables can stream their rows, other lists render the whole page."""
+        return None
+
+    def get_render_cache_key(self, request):
+        return make_key(
+            "render",
+            self.viewset.namespace,
+            self.opts.label_lower,
+            get_model_version(self.model),
+            get_language(),
+            hash_key((request.path, sorted(request.GET.lists()), self.is_fragment_request(request))),
+        )
+
+    def get_cached_response(self, request, *args, **kwargs):
+        """
+        Serve the page from the render cache. Concurrent misses of the same
+        page wait for a single render instead of each running the queries.
+        """
+        rendered = {}
+
+        def render():
+            response = rendered["response"] = self.render_list(request, *args, **kwargs)
+            response.render()
+            # A page holding a CSRF token is bound to its visitor
+            if response.status_code != 200 or request.META.get("CSRF_COOKIE_USED"):
+                return None
+            return (response.content, response["Content-Type"])
+
+        viewset = self.viewset
+        key = self.get_render_cache_key(request)
+        page = coalesce(key, render, viewset.index_render_cache_timeout, viewset.index_render_stale_timeout)
+        if "response" in rendered:
+            return rendered["response"]
+        if page is None:
+            return self.render_list(request, *args, **kwargs)
+        content, content_type = page
+        response = HttpResponse(content, content_type=content_type)
+        patch_vary_headers(response, (self.fragment_header,))
+        return response
+
+    timeout_status = 504
+
     def get(self, request, *args, **kwargs):
+        """
+        Serve the list within the `index` statement timeout. The response is
+        rendered here, as rendering runs the page query, and a timeout gets
+        the "refine your filters" page.
+        """
+        using = self.viewset.get_read_database(request) or db_router.db_for_read(self.model)
+        try:
+            with statement_timeout(self.viewset.get_statement_timeout("index"), using):
+                if self.is_render_cacheable(request):
+                    response = self.get_cached_response(request, *args, **kwargs)
+                else:
+                    response = self.render_list(request, *args, **kwargs)
+                if hasattr(response, "render") and not response.is_rendered:
+                    response.render()
+        except QueryTimeout:
+            logger.warning("%s: list query timed out for %s", self.opts.label, request.get_full_path())
+            response = self.render_timeout_response(request)
+        # The same url serves JSON or HTML depending on the Accept header
+        patch_vary_headers(response, ("Accept",))
+        return response
+
+    def render_timeout_response(self, request):
+        if self.wants_json(request):
+            data = {"detail": _("The query took too long, refine your filters.")}
+            return self.render_to_json_response(data, status=self.timeout_status)
+        context = {
+            "view": self,
+            "viewset": self.viewset,
+            "title": self.title,
+            "filter": getattr(self, "filterset", None),
+            "timeout": self.viewset.get_statement_timeout("index"),
+        }
+        return self.response_class(
+            request=request,
+            template=self.viewset.get_templates("index_timeout"),
+            context=context,
+            using=self.template_engine,
+            status=self.timeout_status,
+        )
+
+    def render_list(self, request, *args, **kwargs):
         filterset_class = self.get_filterset_class()
         self.filterset = self.get_filterset(filterset_class)
 
@@ -144,19 +635,158 @@ class ListView(FilterMixin, MultipleObjectMixin, ModelView):
         else:
             self.object_list = self.filterset.queryset.none()
 
+        if self.wants_json(request):
+            return self.render_to_json_response(self.get_json_data(request))
+        if self.is_fragment_request(request):
+            return self.render_fragment_response()
         context = self.get_context_data(filter=self.filterset, object_list=self.object_list)
-        return self.render_to_response(context)
+        response = None
+        if self.is_streaming_request(request):
+            response = self.render_streaming_response(context)
+        if response is None:
+            response = self.render_to_response(context)
+        patch_vary_headers(response, (self.fragment_header,))
+        return response
+
+
+class TableView(ListView):
+    """A list view rendering the current page through the viewset table."""
+
+    stream_marker = "<!--routes:table-->"
+
+    def render_streaming_response(self, context):
+        """
+        Stream the page of a values table: the template is rendered with a
+        marker standing in for the table and sent up to it at once, then the
+        rows follow in chunks read from a server-side cursor, then the rest
+        of the page.
+        """
+        table = context["table"]
+        if not isinstance(table, ValuesTable):
+            return None
+        context["table"] = mark_safe(self.stream_marker)
+        html = render_to_string(self.get_template_names(), context, request=self.request, using=self.template_engine)
+        head, marker, tail = html.partition(self.stream_marker)
+        if not marker:
+            return HttpResponse(html)
+        return StreamingHttpResponse(self.stream_page(head, table, tail))
+
+    def stream_page(self, head, table, tail):
+        yield head
+        try:
+            with statement_timeout(self.viewset.get_statement_timeout("index"), table.queryset.db):
+                yield from table.stream_html(self.viewset.index_stream_chunk_size)
+        except QueryTimeout:
+            # The head is sent already, close the table and say so
+            logger.warning("%s: streamed list query timed out", self.opts.label)
+            yield format_html(
+                '</tbody></table><p class="timeout">{}</p>', _("The query took too long, refine your filters.")
+            )
+        yield tail
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["table"] = self.viewset.get_table(
+            self.request, context["object_list"], context["aggregates"], self.action_context
+        )
+        return context
+
+    def get_fragment_context_data(self):
+        context = super().get_fragment_context_data()
+        context["table"] = self.viewset.get_table(
+            self.request, context["object_list"], context["aggregates"], self.action_context
+        )
+        return context
+
+
+class BulkActionView(ListView):
+    """A view for running an action on many objects of the filtered list at once."""
+
+    http_method_names = ["post"]
+
+    def get_queryset(self):
+        # Writes always go to the primary
+        queryset = self.viewset.get_queryset(self.request)
+        return queryset.using(db_router.db_for_write(self.model))
+
+    def check_action_permitted(self, user, action):
+        if action == "delete":
+            return self.permission_helper.user_can_bulk_delete(user)
+        return self.permission_helper.user_can_bulk_edit(user)
+
+    def get_success_url(self):
+        # Keep the filter state the action was started from
+        if self.request.GET:
+            return "%s?%s" % (self.index_url, self.request.GET.urlencode())
+        return self.index_url
+
+    def get_action_queryset(self, request):
+        """
+        Return the objects targeted by the action, either the selected ones or,
+        when `select_across` is posted, everything matching the current filter.
+        """
+        filterset = self.get_filterset(self.get_filterset_class())
+        if filterset.is_bound and not filterset.is_valid() and self.get_strict():
+            return filterset.queryset.none()
+        queryset = filterset.qs
+        if request.POST.get("select_across"):
+            return queryset
+        return queryset.filter(pk__in=request.POST.getlist("selected"))
+
+    def get_update_values(self, request):
+        field_name = request.POST.get("field")
+        if field_name not in self.viewset.get_bulk_update_fields(request):
+            raise ValidationError(_("%s can't be bulk updated.") % field_name)
+        field = self.opts.get_field(field_name)
+        formfield = field.formfield()
+        value = request.POST.get("value")
+        value = formfield.clean(value) if formfield else field.to_python(value)
+        return {field.name: value}
+
+    def post(self, request, *args, **kwargs):
+        action = request.POST.get("action")
+        if action not in self.viewset.get_bulk_actions(request):
+            messages.error(request, _("Unknown bulk action!"))
+            return redirect(self.get_success_url())
+        if not self.check_action_permitted(request.user, action):
+            raise PermissionDenied
+        helper = self.viewset.get_bulk_action_helper()
+        try:
+            queryset = self.get_action_queryset(request)
+            if action == "delete":
+                count = helper.delete(queryset)
+                msg = _("%(count)s %(name)s deleted!")
+            else:
+                count = helper.update(queryset, self.get_update_values(request))
+                msg = _("%(count)s %(name)s updated!")
+            self.viewset.mark_written(request)
+            messages.success(request, msg % {"count": count, "name": self.opts.verbose_name_plural})
+        except ValidationError as err:
+            messages.error(request, " ".join(err.messages))
+        except Exception as err:
+            logger.error(err)
+            messages.error(request, _("Bulk action failed!"))
+        return redirect(self.get_success_url())
 
 
 class InstanceSpecificMixin(SingleObjectMixin):
     """A base view for displaying a single object."""
 
-    def __init__(self, viewset, **kwargs):
-        self.queryset = viewset.get_queryset()
-        super().__init__(viewset, **kwargs)
+    read_only = True
+
+    def get_queryset(self):
+        if self.read_only:
+            return self.viewset.get_read_queryset(self.request)
+        queryset = self.viewset.get_queryset(self.request)
+        return queryset.using(db_router.db_for_write(self.model))
+
+    def wants_json(self, request):
+        return False
 
     def dispatch(self, request, *args, **kwargs):
-        self.object = self.get_object()
+        # The JSON response reads a values() row instead of the instance
+        if not self.wants_json(request):
+            self.object = self.get_object()
         return super().dispatch(request, *args, **kwargs)
 
     def get_page_subtitle(self):
@@ -179,9 +809,24 @@ class InstanceSpecificMixin(SingleObjectMixin):
         return self.render_to_response(context)
 
 
-class InspectView(SingleObjectTemplateResponseMixin, InstanceSpecificMixin, ModelView):
+class InspectView(JSONResponseMixin, SingleObjectTemplateResponseMixin, InstanceSpecificMixin, ModelView):
     """A view for displaying a object detail."""
 
+    def get_json_data(self, request):
+        fields = self.viewset.get_inspect_json_fields(request)
+        data = self.get_queryset().filter(pk=self.kwargs.get(self.pk_url_kwarg)).values(*fields).first()
+        if data is None:
+            raise Http404(_("No %(verbose_name)s found matching the query") % {"verbose_name": self.opts.verbose_name})
+        return data
+
+    def get(self, request, *args, **kwargs):
+        if self.wants_json(request):
+            response = self.render_to_json_response(self.get_json_data(request))
+        else:
+            response = super().get(request, *args, **kwargs)
+        patch_vary_headers(response, ("Accept",))
+        return response
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context.update({"action": "inspect"})
@@ -200,6 +845,9 @@ class InspectView(SingleObjectTemplateResponseMixin, InstanceSpecificMixin, Mode
 class DeleteView(InspectView):
     """A view for displaying an object deletion view."""
 
+    json_enabled = False
+    read_only = False
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context.update({"action": "delete"})
@@ -217,9 +865,10 @@ class DeleteView(InspectView):
     def get_success_message(self):
         return _("%s deleted!") % self.object
 
-    def post(self, request):
+    def post(self, request, *args, **kwargs):
         try:
             self.object.delete()
+            self.viewset.mark_written(request)
             msg = self.get_success_message()
             messages.success(request, msg)
         except Exception as err:
@@ -1,24 +1,63 @@
+from time import time
+
 from django.contrib.auth.decorators import login_required
 from django.core.exceptions import ImproperlyConfigured
 from django.core.paginator import Paginator
+from django.db import router as db_router
 from django.db.models import Model
 from django.urls import path, re_path
 from django.utils.decorators import method_decorator
 from django.utils.safestring import mark_safe
-from django_tables2.tables import Table, table_factory
 
-from .helpers import ButtonHelper, PermissionHelper, URLHelper
-from .views import InspectView, ListView
+from .admission import ActionLimiter, admission_controlled
+from .cache import get_lookup_related_models, track_model_version
+from .facets import resolve_facet_field
+from .helpers import BulkActionHelper, ButtonHelper, PermissionHelper, URLHelper
+from .paginator import CachedCountPaginator
+from .profiling import profiled
+from .settings import routers_settings
+from .specs import get_viewset_spec
+from .tables import ValuesColumn, ValuesTable, format_aggregates, resolve_values_field
+from .views import BulkActionView, InspectView, ListView, TableView
 
 login_required_m = method_decorator(login_required)
 
 
+class ActionContext:
+    """
+    Request state of a single viewset action. Viewsets are shared by every
+    request served by the router, so per-request data is carried here and
+    passed along to views and helpers instead of being set on the viewset.
+    """
+
+    __slots__ = ("viewset", "request", "action", "kwargs")
+
+    def __init__(self, viewset, request, action, **kwargs):
+        self.viewset = viewset
+        self.request = request
+        self.action = action
+        self.kwargs = kwargs
+
+    @property
+    def user(self):
+        return self.request.user
+
+
 class BaseViewSet:
     icon = ""
     prefix = None
     menu_label = None
     menu_icon = None
     menu_order = None
+    # Concurrency limits per action name, e.g. {"index": 4, "bulk": 1}
+    action_limits = {}
+    action_shared_limits = {}
+    action_queue_timeout = 1
+    action_reject_status = 503
+    action_retry_after = 5
+    action_limiter_class = ActionLimiter
+    # Database statement timeouts in seconds per action name, e.g. {"index": 5}
+    action_statement_timeouts = {}
 
     def __init__(self, router=None):
         """Don't allow initialisation unless self.model is set to a valid model"""
@@ -52,19 +91,49 @@ class BaseViewSet:
         """Utilised by 'register_webapp_urls' hook to register urls to router."""
         return []
 
+    def get_action_context(self, request, action, **kwargs):
+        """Return the request-scoped context handed to the view serving `action`."""
+        return ActionContext(self, request, action, **kwargs)
+
     def has_view(self, view_name):
         return hasattr(self, view_name)
 
+    def get_action_limiter(self, action):
+        """
+        Return the limiter admitting requests to `action`, or None when the
+        action isn't limited. Limiters are built once per viewset.
+        """
+        limiters = self.__dict__.setdefault("_action_limiters", {})
+        if action not in limiters:
+            limit = self.action_limits.get(action)
+            shared_limit = self.action_shared_limits.get(action)
+            limiter = None
+            if limit or shared_limit:
+                limiter = self.action_limiter_class(
+                    "%s:%s:%s" % (self.router.namespace, self.get_prefix(), action),
+                    limit=limit,
+                    shared_limit=shared_limit,
+                    queue_timeout=self.action_queue_timeout,
+                    status=self.action_reject_status,
+                    retry_after=self.action_retry_after,
+                )
+            limiters.setdefault(action, limiter)
+        return limiters[action]
+
+    def get_statement_timeout(self, action):
+        """Return the statement timeout of `action` in seconds, None for no timeout."""
+        return self.action_statement_timeouts.get(action)
+
 
 class BaseFormViewset:
 
-    form_view_extra_css = []
-    form_view_extra_js = []
-    form_fields_exclude = []
+    form_view_extra_css = ()
+    form_view_extra_js = ()
+    form_fields_exclude = ()
     prepopulated_fields = {}
     success_url_name = "index"
 
-    def get_success_url(self):
+    def get_success_url(self, action_context):
         if (self.success_url_name == "index" and self.has_view("index_view")) or (
             self.success_url_name == "create" and self.has_view("index_view")
         ):
@@ -72,7 +141,7 @@ class BaseFormViewset:
         if (self.success_url_name == "edit" and self.has_view("index_view")) or (
             self.success_url_name == "inspect" and self.has_view("index_view")
         ):
-            return self.url_helper.get_action_url(self.success_url_name, pk=self.pk)
+            return self.url_helper.get_action_url(self.success_url_name, pk=action_context.kwargs["pk"])
         else:
             raise ImproperlyConfigured("success_url_name `index`, `create`, `edit`, `inspect`")
 
@@ -90,6 +159,10 @@ class ModelViewSet(BaseViewSet):
     button_helper_class = ButtonHelper
     permission_helper_class = PermissionHelper
     template_namespace = None
+    # Database alias serving read actions, defaults to the READ_DATABASE setting
+    read_database = None
+    read_after_write_seconds = None
+    read_after_write_session_key = "_routes_written_at"
 
     def __init__(self, router=None):
         """Don't allow initialisation unless self.model is set to a valid model"""
@@ -99,16 +172,57 @@ class ModelViewSet(BaseViewSet):
                 "The model attribute on your '%s' class must be set, and "
                 "must be a valid Django model." % self.__class__.__name__
             )
-        self.opts = self.model._meta
+        # Model metadata is shared by every router registering this class
+        self.spec = get_viewset_spec(self.__class__, self.get_permission_helper_class())
+        self.opts = self.spec.opts
         self.namespace = self.router.namespace
         self.url_helper = self.get_url_helper_class()(self.namespace, self.model)
-        self.permission_helper = self.get_permission_helper_class()(self.model)
+        self.permission_helper = self.spec.permission_helper
 
-    def get_queryset(self):
-        """Returns a QuerySet of all model instances."""
+    def get_queryset(self, request=None):
+        """
+        Returns a QuerySet of all model instances. When `request` is given,
+        rows are restricted and annotated by the permission helper row rules.
+        """
         qs = self.model._default_manager.get_queryset()
+        if request is not None:
+            ph = self.permission_helper
+            qs = ph.annotate_queryset(request.user, ph.filter_queryset(request.user, qs))
         return qs
 
+    def get_read_database(self, request=None):
+        """
+        Return the database alias read actions (index, inspect, counts, JSON)
+        should use. Right after a write in the same session, reads stick to
+        the primary so users see their own changes despite replica lag.
+        """
+        alias = self.read_database or routers_settings.READ_DATABASE
+        if alias and request is not None and self.is_read_after_write(request):
+            return db_router.db_for_write(self.model)
+        return alias
+
+    def get_read_queryset(self, request=None):
+        """Returns `get_queryset()` routed to the read database."""
+        qs = self.get_queryset(request)
+        alias = self.get_read_database(request)
+        return qs.using(alias) if alias else qs
+
+    def is_read_after_write(self, request):
+        session = getattr(request, "session", None)
+        if session is None:
+            return False
+        written_at = session.get(self.read_after_write_session_key)
+        seconds = self.read_after_write_seconds
+        if seconds is None:
+            seconds = routers_settings.READ_AFTER_WRITE_SECONDS
+        return written_at is not None and time() - written_at < seconds
+
+    def mark_written(self, request):
+        """Record a write in the session, starting the read-your-writes window."""
+        session = getattr(request, "session", None)
+        if session is not None:
+            session[self.read_after_write_session_key] = time()
+
     def get_permission_helper_class(self):
         """Returns a permission_helper class to help with permission-based logic."""
         return self.permission_helper_class
@@ -120,8 +234,9 @@ class ModelViewSet(BaseViewSet):
         """Returns a ButtonHelper class to help generate buttons for the given model."""
         return self.button_helper_class
 
-    def get_button_helper(self):
-        return self.button_helper
+    def get_button_helper(self, action_context):
+        """Return the button helper of one action, bound to its request."""
+        return self.get_button_helper_class()(self, action_context.request)
 
     def get_url_helper_class(self):
         return self.url_helper_class
@@ -130,7 +245,18 @@ class ModelViewSet(BaseViewSet):
         return self.url_helper
 
     def get_prefix(self):
-        return "%s/%s/" % (str(self.opts.app_label).replace("_", "-"), self.opts.model_name)
+        return self.spec.prefix
+
+    def get_values_fields(self, field_names):
+        """
+        Return the subset of `field_names` that `.values()` can read directly,
+        i.e. concrete fields and `__` lookups, always starting with the pk.
+        """
+        fields = [self.opts.pk.attname]
+        for name in field_names:
+            if name not in fields and (name in self.spec.concrete_field_names or "__" in name):
+                fields.append(name)
+        return fields
 
     def get_templates(self, action="index"):
         """
@@ -138,50 +264,97 @@ class ModelViewSet(BaseViewSet):
         view, when the template isn't overridden by one of the template
         attributes on the class.
         """
-        namespace = self.router.namespace
-        app_label = self.opts.app_label.lower()
-        model_name = self.opts.model_name.lower()
-        templates = [
-            "%s/%s/%s/%s.html" % (namespace, app_label, model_name, action),
-            "%s/%s/%s.html" % (namespace, model_name, action),
-            "%s/%s.html" % (namespace, action),
-        ]
-        return templates
+        return self.spec.get_templates(self.router.namespace, action)
 
 
 class ListViewSetMixin(ModelViewSet):
     index_public = True
     index_title = None
-    index_view_extra_css = list()
-    index_view_extra_js = list()
+    index_view_extra_css = tuple()
+    index_view_extra_js = tuple()
     index_view_class = ListView
     index_template_name = None
+    index_fragment_template_name = None
 
     paginate_by = 20
     paginate_orphans = 0
     paginator_class = Paginator
+    filter_pk_cache = False
+    filter_pk_cache_max = 1000
+    filter_pk_cache_timeout = 300
+    index_render_cache = False
+    index_render_cache_timeout = 30
+    index_render_stale_timeout = 0
+    index_streaming = False
+    index_stream_chunk_size = 500
+    # Aggregates of the filtered list per field, e.g. {"price": (Sum, Avg)}
+    list_aggregates = {}
+    # Filter fields shown with value counts, True for every choice, boolean or foreign key filter
+    list_facets = ()
+    list_facets_top_k = 10
+    list_facets_cache_timeout = 300
     filterset_fields = None
     filterset_class = None
     select_related = False
     ordering = ("pk",)
 
-    def get_queryset(self):
+    def get_queryset(self, request=None):
         """
         Returns a QuerySet of all model instances that can be edited by the
         admin site.
         """
-        qs = super().get_queryset()
+        qs = super().get_queryset(request)
         ordering = self.get_ordering()
         if ordering:
             qs = qs.order_by(*ordering)
         select_related = self.get_select_related()
         if select_related:
-            qs.select_related(*select_related)
+            qs = qs.select_related(*select_related)
         return qs
 
+    def __init__(self, router=None):
+        super().__init__(router=router)
+        cached_count = issubclass(self.get_paginator_class(), CachedCountPaginator)
+        if self.filter_pk_cache or self.index_render_cache or self.list_facets or cached_count:
+            track_model_version(self.model)
+        for name, field in self.get_facet_fields(None):
+            if field.is_relation:
+                track_model_version(field.related_model)
+
     def get_filterset_class(self):
-        """Return self.filterset class, if None load default FilterView"""
-        return self.filterset_class
+        """
+        Return self.filterset class. When only `filterset_fields` is set, the
+        class generated from them is built once and reused by every request.
+        """
+        if self.filterset_class:
+            return self.filterset_class
+        filterset_fields = self.get_filterset_fields()
+        if not filterset_fields:
+            return None
+        key = tuple(filterset_fields)
+        cache = self.__dict__.setdefault("_filterset_classes", {})
+        if key not in cache:
+            from django_filters.filterset import filterset_factory
+
+            cache[key] = filterset_factory(model=self.model, fields=filterset_fields)
+        return cache[key]
+
+    def get_filter_related_models(self, filterset_class):
+        """
+        Return the related models read by the filters of `filterset_class`,
+        e.g. Category for a `category__name` filter, whose versions key the
+        filter result cache. Their versions are tracked from the first call.
+        """
+        cache = self.__dict__.setdefault("_filter_related_models", {})
+        if filterset_class not in cache:
+            related_models = []
+            for filter_ in filterset_class.base_filters.values():
+                for model in get_lookup_related_models(self.opts, filter_.field_name or ""):
+                    if model not in related_models:
+                        track_model_version(model)
+                        related_models.append(model)
+            cache[filterset_class] = related_models
+        return cache[filterset_class]
 
     def get_ordering(self):
         return self.ordering or ()
@@ -210,17 +383,53 @@ class ListViewSetMixin(ModelViewSet):
         """
         return self.filterset_fields
 
+    def get_list_aggregates(self, request):
+        """
+        Return the aggregates computed over the filtered list, as a dict of
+        field name to a tuple of aggregate classes (`Sum`, `Avg`, `Count`,
+        `Min`, `Max`...).
+        """
+        return {
+            name: tuple(funcs) if isinstance(funcs, (list, tuple)) else (funcs,)
+            for name, funcs in self.list_aggregates.items()
+        }
+
+    def get_list_facets(self, request):
+        """Return the names of the filter fields shown with value counts."""
+        if self.list_facets is True:
+            return list(self.get_filterset_fields() or ())
+        return list(self.list_facets)
+
+    def get_facet_fields(self, request):
+        """Return (name, model field) pairs of the `get_list_facets()` fields that can be counted."""
+        pairs = []
+        for name in self.get_list_facets(request):
+            field = resolve_facet_field(self.opts, name)
+            if field is not None:
+                pairs.append((name, field))
+        return pairs
+
     def get_index_title(self):
         return self.index_title or self.opts.verbose_name_plural.title()
 
+    def get_index_json_fields(self, request):
+        """Return the fields serialized by the list view JSON response."""
+        return self.get_values_fields(self.spec.concrete_field_names)
+
     def get_index_template(self):
         return self.index_template_name or self.get_templates("index")
 
+    def get_index_fragment_template(self):
+        """Return the template rendering only the table body and pager of the list view."""
+        return self.index_fragment_template_name or self.get_templates("index_fragment")
+
+    @admission_controlled("index")
+    @profiled("index")
     def index_view(self, request):
-        self.request = request
         kwargs = {
             "viewset": self,
             "title": self.get_index_title(),
+            "action_context": self.get_action_context(request, "index"),
         }
         view_class = self.index_view_class
         return view_class.as_view(**kwargs)(request)
@@ -229,6 +438,8 @@ class ListViewSetMixin(ModelViewSet):
         """
         Append urls to generic viewsets.
         """
+        # Build the generated filterset class while the url conf compiles
+        self.get_filterset_class()
         urls = super().get_urls()
         urls = urls + [
             path(
@@ -242,19 +453,23 @@ class ListViewSetMixin(ModelViewSet):
 
 class InspectViewSetMixin(BaseViewSet):
 
+    # Rows hidden by the permission helper row rules stay hidden on public pages
     inspect_public = True
-    inspect_view_fields = []
-    inspect_view_fields_exclude = []
-    inspect_view_extra_css = []
-    inspect_view_extra_js = []
+    sitemap_lastmod_field = None
+    inspect_view_fields = ()
+    inspect_view_fields_exclude = ()
+    inspect_view_extra_css = ()
+    inspect_view_extra_js = ()
     inspect_view_class = InspectView
     inspect_template_name = None
 
+    @admission_controlled("inspect")
+    @profiled("inspect")
     def inspect_view(self, request, pk):
-        self.request = request
         kwargs = {
             "viewset": self,
             "title": self.get_inspect_title(),
+            "action_context": self.get_action_context(request, "inspect", pk=pk),
         }
         view_class = self.inspect_view_class
         return view_class.as_view(**kwargs)(request, pk=pk)
@@ -262,6 +477,17 @@ class InspectViewSetMixin(BaseViewSet):
     def get_inspect_title(self):
         return self.index_title or "%s Detail" % self.opts.verbose_name.title()
 
+    def get_warmup_inspect_pks(self, limit):
+        """
+        Return the pks of the inspect pages requested by `routes_warmup`.
+        Override to return the most viewed objects, defaults to the first ones.
+        """
+        return self.get_queryset().values_list("pk", flat=True)[:limit]
+
+    def get_inspect_json_fields(self, request):
+        """Return the fields serialized by the inspect view JSON response."""
+        return self.get_values_fields(self.get_inspect_view_fields())
+
     def get_inspect_template(self):
         return self.inspect_template_name or self.get_templates("inspect")
 
@@ -280,12 +506,7 @@ class InspectViewSetMixin(BaseViewSet):
         'inspect_view_fields_exclude' not being included.
         """
         if not self.inspect_view_fields:
-            found_fields = []
-            for f in self.model._meta.get_fields():
-                if f.name not in self.inspect_view_fields_exclude:
-                    if f.concrete and (not f.is_relation or (not f.auto_created and f.related_model)):
-                        found_fields.append(f.name)
-            return found_fields
+            return list(self.spec.inspect_view_fields)
         return self.inspect_view_fields
 
     def get_urls(self):
@@ -305,25 +526,106 @@ class InspectViewSetMixin(BaseViewSet):
 
 class TableViewSetMixin(ListViewSetMixin):
 
+    index_view_class = TableView
     list_export = tuple()
     table_class = None
     table_template = "shared/table.html"
     table_add_buttons = None
+    table_values_rows = False
+    # Rendered rows are cached by values tables only: it needs `table_values_rows`
+    # and every `list_display` entry resolving to a field, see `get_values_table_columns()`
+    table_row_cache = False
+    table_row_cache_timeout = 300
+    table_row_version_field = None
     list_display = None
     list_display_exclude = None
     empty_value_display = "-"
 
+    # Opt-in, e.g. ("delete", "update"): the actions can run over the whole filtered list
+    bulk_actions = ()
+    bulk_update_fields = tuple()
+    bulk_chunk_size = 500
+    bulk_action_view_class = BulkActionView
+    bulk_action_helper_class = BulkActionHelper
+
     def get_table_class(self, request):
         table_class = self.table_class
         if not table_class:
-            table_class = table_factory(
-                table=Table,
-                model=self.model,
-                fields=self.get_list_display(request),
-                exclude=self.get_list_display_exclude(request),
-            )
+            fields = self.get_list_display(request)
+            exclude = self.get_list_display_exclude(request)
+            key = (fields and tuple(fields), exclude and tuple(exclude))
+            # Generated classes are reused, building one per request is costly
+            cache = self.__dict__.setdefault("_table_classes", {})
+            if key not in cache:
+                from django_tables2.tables import Table, table_factory
+
+                cache[key] = table_factory(table=Table, model=self.model, fields=fields, exclude=exclude)
+            table_class = cache[key]
         return table_class
 
+    def get_values_table_columns(self, request):
+        """
+        Return the precomputed columns used to render rows from `values_list()`
+        tuples, or None when a `list_display` entry needs the model instance
+        (methods, properties, bare relations).
+        """
+        list_display = self.get_list_display(request)
+        if not list_display:
+            return None
+        key = tuple(list_display)
+        cache = self.__dict__.setdefault("_values_table_columns", {})
+        if key not in cache:
+            columns = []
+            empty_value_display = self.get_empty_value_display()
+            for name in list_display:
+                field = resolve_values_field(self.opts, name)
+                if field is None:
+                    columns = None
+                    break
+                columns.append(ValuesColumn(name, field, empty_value_display))
+            cache[key] = columns
+        return cache[key]
+
+    def get_table(self, request, object_list, aggregates=None, action_context=None):
+        """
+        Return the table rendering `object_list`. With `table_values_rows`
+        enabled and no custom `table_class`, rows are built from
+        `values_list()` whenever every column allows it, otherwise a
+        django-tables2 table is used. `aggregates` are rendered as the table
+        footer, under their columns. The table buttons come from
+        `get_button_helper(action_context)`.
+        """
+        if self.table_values_rows and self.table_class is None:
+            columns = self.get_values_table_columns(request)
+            if columns is not None:
+                return ValuesTable(self, request, object_list, columns, aggregates, action_context)
+        table_class = self.get_table_class(request)
+        table = table_class(object_list, **self.get_table_kwargs(request))
+        if aggregates:
+            empty_value_display = self.get_empty_value_display()
+            for bound_column in table.columns:
+                values = aggregates.get(bound_column.name)
+                if values:
+                    # Each table holds copies of the class columns, the footer stays with this request
+                    bound_column.column._footer = format_aggregates(values, empty_value_display)
+        return table
+
+    def get_row_permission_fingerprint(self, request):
+        """
+        Return a short string identifying which action buttons `request.user`
+        gets on table rows, used to key cached row fragments. Permission
+        helpers with object level rules must override this, as the default
+        checks model-wide permissions only.
+        """
+        if not self.table_add_buttons:
+            return "-"
+        ph = self.permission_helper
+        user = request.user
+        return "".join(
+            "1" if check(user, None) else "0"
+            for check in (ph.user_can_inspect_obj, ph.user_can_edit_obj, ph.user_can_delete_obj)
+        )
+
     def get_table_kwargs(self, request):
         """
         Return a table object to use. The table has automatic support for
@@ -341,6 +643,12 @@ class TableViewSetMixin(ListViewSetMixin):
         """
         return self.list_display
 
+    def get_index_json_fields(self, request):
+        list_display = self.get_list_display(request)
+        if not list_display:
+            return super().get_index_json_fields(request)
+        return self.get_values_fields(list_display)
+
     def get_list_display_exclude(self, request):
         """
         Return a sequence containing the fields/method output
@@ -394,6 +702,51 @@ class TableViewSetMixin(ListViewSetMixin):
         """
         return {}
 
+    def get_bulk_actions(self, request):
+        """
+        Return a sequence of bulk actions (`delete`, `update`) available on
+        the list view.
+        """
+        return self.bulk_actions
+
+    def get_bulk_update_fields(self, request):
+        """
+        Return a sequence of field names that the `update` bulk action is
+        allowed to change.
+        """
+        return self.bulk_update_fields
+
+    def get_bulk_action_helper_class(self):
+        return self.bulk_action_helper_class
+
+    def get_bulk_action_helper(self):
+        return self.get_bulk_action_helper_class()(self, chunk_size=self.bulk_chunk_size)
+
+    @admission_controlled("bulk")
+    def bulk_view(self, request):
+        kwargs = {
+            "viewset": self,
+            "title": self.get_index_title(),
+            "action_context": self.get_action_context(request, "bulk"),
+        }
+        view_class = self.bulk_action_view_class
+        return view_class.as_view(**kwargs)(request)
+
+    def get_urls(self):
+        """
+        Append urls to generic viewsets.
+        """
+        urls = super().get_urls()
+        if self.bulk_actions:
+            urls = urls + [
+                re_path(
+                    self.url_helper.get_pattern("bulk"),
+                    self.bulk_view,
+                    name=self.url_helper.get_name("bulk"),
+                ),
+            ]
+        return urls
+
 
 class ReadOnlyViewSet(InspectViewSetMixin, ListViewSetMixin):
     pass
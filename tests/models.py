@@ -0,0 +1,49 @@
+from django.conf import settings
+from django.db import models
+
+
+class Category(models.Model):
+    name = models.CharField(max_length=100)
+
+    def __str__(self):
+        return self.name
+
+
+class Product(models.Model):
+    STATUS_CHOICES = (("draft", "Draft"), ("published", "Published"))
+
+    name = models.CharField(max_length=100)
+    name_en = models.CharField(max_length=100, blank=True)
+    price = models.DecimalField(max_digits=8, decimal_places=2)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="draft")
+    is_active = models.BooleanField(default=True)
+    category = models.ForeignKey(Category, null=True, blank=True, on_delete=models.SET_NULL)
+
+    class Meta:
+        ordering = ("pk",)
+
+    def __str__(self):
+        return self.name
+
+
+class Tag(models.Model):
+    """A model without relations, deleted without the collector."""
+
+    name = models.CharField(max_length=100)
+
+    class Meta:
+        ordering = ("pk",)
+
+
+class Note(models.Model):
+    """A model with row level permissions, granted to its owner and group."""
+
+    title = models.CharField(max_length=100)
+    owner = models.ForeignKey(settings.AUTH_USER_MODEL, null=True, blank=True, on_delete=models.CASCADE)
+    group = models.ForeignKey("auth.Group", null=True, blank=True, on_delete=models.SET_NULL)
+
+    class Meta:
+        ordering = ("pk",)
+
+    def __str__(self):
+        return self.title
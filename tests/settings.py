@@ -0,0 +1,30 @@
+"""
+Settings of the django_routes test suite, run with:
+
+    python manage.py test tests --settings=tests.settings
+"""
+from example.settings import *  # noqa: F401,F403
+
+INSTALLED_APPS = [
+    "django_routes",
+    "tests",
+    "django.contrib.auth",
+    "django.contrib.contenttypes",
+    "django.contrib.sessions",
+    "django.contrib.messages",
+    "django.contrib.staticfiles",
+]
+
+ROOT_URLCONF = "tests.urls"
+
+# Two SQLite databases stand in for a primary and its read replica
+DATABASES = {
+    "default": {"ENGINE": "django.db.backends.sqlite3", "NAME": ":memory:"},
+    "replica": {"ENGINE": "django.db.backends.sqlite3", "NAME": ":memory:"},
+}
+
+CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+PASSWORD_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+
+ALLOWED_HOSTS = ["testserver"]
@@ -0,0 +1,4 @@
+// List page behaviour
+(function () {
+  document.documentElement.className += " js";
+})();
@@ -0,0 +1,93 @@
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+
+from django_routes.admission import ActionLimiter
+
+from .models import Product
+from .urls import site
+from .viewsets import ProductViewSet
+
+
+class ActionLimiterTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_limit(self):
+        limiter = ActionLimiter("tests:limit", limit=1)
+        self.assertTrue(limiter.acquire())
+        self.assertFalse(limiter.acquire())
+        limiter.release()
+        self.assertTrue(limiter.acquire())
+        limiter.release()
+
+    def test_shared_limit(self):
+        first = ActionLimiter("tests:shared", shared_limit=1)
+        # Another process, sharing the cache counter
+        second = ActionLimiter("tests:shared", shared_limit=1)
+        self.assertTrue(first.acquire())
+        self.assertFalse(second.acquire())
+        first.release()
+        self.assertTrue(second.acquire())
+        second.release()
+
+    def test_reject_response(self):
+        limiter = ActionLimiter("tests:reject", limit=1, status=429, retry_after=7)
+        response = limiter.get_reject_response()
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response["Retry-After"], "7")
+
+
+class AdmissionControlTests(TestCase):
+    index_url = "/tests/product/"
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_superuser("admin", "admin@example.com", "password")
+        Product.objects.create(name="Chair", price=Decimal("10.00"))
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+        self.viewset = site.get_viewset(ProductViewSet)
+        self.patch_viewset(action_limits={"index": 1}, action_queue_timeout=0)
+        # Limiters are built once per viewset, drop the ones of other tests
+        self.viewset.__dict__.pop("_action_limiters", None)
+        self.addCleanup(self.viewset.__dict__.pop, "_action_limiters", None)
+        self.limiter = self.viewset.get_action_limiter("index")
+
+    def patch_viewset(self, **attrs):
+        patcher = mock.patch.multiple(self.viewset, **attrs)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_reject_when_busy(self):
+        self.assertTrue(self.limiter.acquire())
+        try:
+            with self.assertLogs("engine", "WARNING"):
+                response = self.client.get(self.index_url)
+        finally:
+            self.limiter.release()
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response["Retry-After"], "5")
+        self.assertEqual(self.limiter.rejected, 1)
+        self.assertEqual(self.limiter.get_shared_rejected(), 1)
+        self.assertEqual(self.client.get(self.index_url).status_code, 200)
+
+    def test_slot_released(self):
+        self.assertEqual(self.client.get(self.index_url).status_code, 200)
+        self.assertEqual(self.client.get(self.index_url).status_code, 200)
+
+    def test_streamed_slot_held_until_consumed(self):
+        self.patch_viewset(index_streaming=True)
+        response = self.client.get(self.index_url)
+        self.assertTrue(response.streaming)
+        self.assertFalse(self.limiter.acquire())
+        content = b"".join(response.streaming_content).decode()
+        response.close()
+        self.assertIn("Chair", content)
+        self.assertTrue(self.limiter.acquire())
+        self.limiter.release()
@@ -0,0 +1,63 @@
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db.models import Max, Sum
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+
+from .models import Product
+from .urls import site
+from .viewsets import ProductViewSet
+
+
+class AggregateTests(TestCase):
+    index_url = "/tests/product/"
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_superuser("admin", "admin@example.com", "password")
+        for price in ("1.00", "2.00", "3.50"):
+            Product.objects.create(name="Product %s" % price, price=Decimal(price), status="published")
+        Product.objects.create(name="Draft", price=Decimal("10.00"))
+
+    def setUp(self):
+        self.client.force_login(self.user)
+        viewset = site.get_viewset(ProductViewSet)
+        patcher = mock.patch.multiple(viewset, list_aggregates={"price": (Sum, Max)}, paginate_by=2)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_footer(self):
+        response = self.client.get(self.index_url, {"status": "published"})
+        self.assertContains(response, "<tfoot>")
+        self.assertContains(response, '<td class="aggregate-price">Sum: 6.5<br>Max: 3.5</td>', html=True)
+
+    def test_django_tables2_footer(self):
+        viewset = site.get_viewset(ProductViewSet)
+        request = RequestFactory().get(self.index_url)
+        request.user = self.user
+        aggregates = {"price": [("Sum", Decimal("6.5")), ("Max", None)]}
+        with mock.patch.object(viewset, "table_values_rows", False):
+            table = viewset.get_table(request, Product.objects.all(), aggregates)
+            plain = viewset.get_table(request, Product.objects.all())
+        self.assertTrue(table.has_footer())
+        self.assertEqual(table.columns["price"].footer, "Sum: 6.5<br>Max: -")
+        self.assertFalse(table.columns["name"].has_footer())
+        # Footers belong to the table they were computed for
+        self.assertFalse(plain.has_footer())
+
+    def test_json(self):
+        data = self.client.get(self.index_url, {"format": "json", "status": "published"}).json()
+        self.assertEqual(data["aggregates"], {"price": [["Sum", "6.5"], ["Max", "3.5"]]})
+        self.assertEqual(data["count"], 3)
+
+    def test_count_reused(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.index_url, {"status": "published"})
+        self.assertEqual(response.context["paginator"].count, 3)
+        counts = [query["sql"] for query in queries.captured_queries if "COUNT(" in query["sql"]]
+        # A single query counts the rows along the aggregates
+        self.assertEqual(len(counts), 1)
+        self.assertIn("SUM(", counts[0])
@@ -0,0 +1,134 @@
+import gzip
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.template import Context, Template
+from django.test import SimpleTestCase, override_settings
+
+from django_routes import assets
+from django_routes.assets import build_bundle, minify_css, rewrite_css_urls
+
+from .urls import TestRouter
+from .viewsets import ProductViewSet
+
+
+class AssetProductViewSet(ProductViewSet):
+    index_view_extra_css = ("tests/css/widgets.css",)
+    index_view_extra_js = ("tests/js/list.js", "https://cdn.example.com/chart.js")
+    inspect_view_extra_js = ("tests/js/list.js",)
+
+
+site = TestRouter()
+site.register(AssetProductViewSet)
+
+
+class MinifyCSSTests(SimpleTestCase):
+    def test_declarations(self):
+        self.assertEqual(minify_css("a {\n  color : red;\n  margin: 0 ;\n}\n"), "a{color :red;margin:0;}")
+
+    def test_comments(self):
+        self.assertEqual(minify_css("/* a comment */ p { color: red }"), "p{color:red}")
+
+    def test_descendant_pseudo_class_selector(self):
+        self.assertEqual(minify_css(".list :hover { color: red }"), ".list :hover{color:red}")
+        self.assertEqual(minify_css("a:hover, p :first-child { color: red }"), "a:hover,p :first-child{color:red}")
+
+
+class RewriteCSSUrlsTests(SimpleTestCase):
+    def rewrite(self, source):
+        return rewrite_css_urls(source, "tests/css/widgets.css", "routes/bundles/website")
+
+    def test_relative_urls(self):
+        self.assertEqual(self.rewrite('url("../img/a.png")'), 'url("../../../tests/img/a.png")')
+        self.assertEqual(self.rewrite("url( 'b.png' )"), "url( '../../../tests/css/b.png' )")
+        self.assertEqual(self.rewrite("url(font.woff?v=1#iefix)"), "url(../../../tests/css/font.woff?v=1#iefix)")
+
+    def test_imports(self):
+        self.assertEqual(self.rewrite('@import "base.css";'), '@import "../../../tests/css/base.css";')
+        self.assertEqual(self.rewrite("@import url(../reset.css);"), "@import url(../../../tests/reset.css);")
+
+    def test_absolute_urls_kept(self):
+        for url in ("/static/a.png", "https://cdn.example.com/a.png", "//cdn.example.com/a.png", "#mask"):
+            with self.subTest(url=url):
+                self.assertEqual(self.rewrite("url(%s)" % url), "url(%s)" % url)
+        data = "url(data:image/gif;base64,R0lGODlhAQABAAAAACw=)"
+        self.assertEqual(self.rewrite(data), data)
+
+    def test_bundle(self):
+        content = build_bundle(["tests/css/widgets.css"], "css", "routes/bundles/website")
+        self.assertIn('@import "../../../tests/css/base.css";', content)
+        self.assertIn('url("../../../tests/img/icon.png?v=2#top")', content)
+        self.assertIn("url(/static/logo.png),url(https://cdn.example.com/logo.png)", content)
+        self.assertIsNone(build_bundle(["tests/css/widgets.css", "tests/css/missing.css"], "css"))
+
+
+class BundleAssetsCommandTests(SimpleTestCase):
+    def setUp(self):
+        self.output_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.output_dir)
+
+    def test_bundles(self):
+        stdout, stderr = StringIO(), StringIO()
+        call_command(
+            "routes_bundle_assets",
+            router="tests.test_assets.site",
+            output=self.output_dir,
+            stdout=stdout,
+            stderr=stderr,
+        )
+        with open(os.path.join(self.output_dir, assets.MANIFEST_NAME)) as f:
+            manifest = json.load(f)
+        self.assertEqual(sorted(manifest), ["website:tests.product:index:css", "website:tests.product:inspect:js"])
+        # A CDN file can't be bundled, the index js stays as individual files
+        self.assertIn("website:tests.product:index:js: not every asset", stderr.getvalue())
+        self.assertIn("Wrote 2 bundles.", stdout.getvalue())
+
+        path = manifest["website:tests.product:index:css"]
+        self.assertRegex(path, r"^routes/bundles/website/tests\.product\.index\.[0-9a-f]{12}\.css$")
+        with open(os.path.join(self.output_dir, path), encoding="utf-8") as f:
+            content = f.read()
+        self.assertIn('url("../../../tests/img/icon.png?v=2#top")', content)
+        self.assertNotIn("/*", content)
+        with gzip.open(os.path.join(self.output_dir, path + ".gz"), "rt", encoding="utf-8") as f:
+            self.assertEqual(f.read(), content)
+
+
+class RoutesAssetsTagTests(SimpleTestCase):
+    manifest = {
+        "website:tests.product:index:css": "routes/bundles/website/tests.product.index.0123456789ab.css",
+    }
+
+    def setUp(self):
+        self.viewset = site.get_viewset(AssetProductViewSet)
+        patcher = mock.patch.object(assets, "_manifest", self.manifest)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def render(self, action, asset_type):
+        template = Template("{% load routes_tags %}{% routes_assets viewset action asset_type %}")
+        return template.render(Context({"viewset": self.viewset, "action": action, "asset_type": asset_type}))
+
+    @override_settings(DEBUG=False)
+    def test_bundle(self):
+        self.assertEqual(
+            self.render("index", "css"),
+            '<link rel="stylesheet" href="/static/routes/bundles/website/tests.product.index.0123456789ab.css">',
+        )
+
+    @override_settings(DEBUG=True)
+    def test_individual_files_in_debug(self):
+        self.assertEqual(self.render("index", "css"), '<link rel="stylesheet" href="/static/tests/css/widgets.css">')
+
+    @override_settings(DEBUG=False)
+    def test_cdn_fallback(self):
+        # Not bundled, the files are linked one by one and CDN urls kept as they are
+        self.assertEqual(
+            self.render("index", "js"),
+            '<script src="/static/tests/js/list.js"></script>\n'
+            '<script src="https://cdn.example.com/chart.js"></script>',
+        )
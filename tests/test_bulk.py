@@ -0,0 +1,150 @@
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Permission
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete
+from django.test import TestCase
+
+from django_routes import viewsets
+from django_routes.cache import get_model_version
+from django_routes.helpers import BulkActionHelper
+
+from .models import Category, Product, Tag
+from .urls import TestRouter, site
+from .viewsets import ProductViewSet
+
+
+class TagViewSet(viewsets.TableViewSetMixin):
+    model = Tag
+
+
+class CategoryTableViewSet(viewsets.TableViewSetMixin):
+    model = Category
+
+
+class BulkActionHelperTests(TestCase):
+    def get_helper(self, viewset_class, chunk_size=2):
+        return BulkActionHelper(TestRouter().register(viewset_class), chunk_size=chunk_size)
+
+    def patch_raw_delete(self):
+        patcher = mock.patch.object(QuerySet, "_raw_delete", autospec=True, side_effect=QuerySet._raw_delete)
+        self.addCleanup(patcher.stop)
+        return patcher.start()
+
+    def test_iter_pk_chunks(self):
+        tags = [Tag.objects.create(name="Tag %s" % i) for i in range(5)]
+        chunks = list(self.get_helper(TagViewSet).iter_pk_chunks(Tag.objects.order_by("-name")))
+        self.assertEqual(chunks, [[tags[0].pk, tags[1].pk], [tags[2].pk, tags[3].pk], [tags[4].pk]])
+
+    def test_delete_fast_path(self):
+        for i in range(5):
+            Tag.objects.create(name="Tag %s" % i)
+        Tag.objects.create(name="Kept")
+        helper = self.get_helper(TagViewSet)
+        raw_delete = self.patch_raw_delete()
+        progress = mock.Mock()
+        version = get_model_version(Tag)
+        queryset = Tag.objects.filter(name__startswith="Tag")
+        self.assertTrue(helper.can_fast_delete(queryset))
+        self.assertEqual(helper.delete(queryset, progress), 5)
+        self.assertEqual(raw_delete.call_count, 3)
+        calls = [call.args for call in progress.call_args_list]
+        self.assertEqual(calls, [("delete", 2, 5), ("delete", 4, 5), ("delete", 5, 5)])
+        self.assertEqual(list(Tag.objects.values_list("name", flat=True)), ["Kept"])
+        self.assertNotEqual(get_model_version(Tag), version)
+
+    def test_delete_with_signal_uses_collector(self):
+        for i in range(3):
+            Tag.objects.create(name="Tag %s" % i)
+        deleted = []
+
+        def receiver(instance, **kwargs):
+            deleted.append(instance.pk)
+
+        post_delete.connect(receiver, sender=Tag)
+        self.addCleanup(post_delete.disconnect, receiver, sender=Tag)
+        helper = self.get_helper(TagViewSet)
+        raw_delete = self.patch_raw_delete()
+        self.assertFalse(helper.can_fast_delete(Tag.objects.all()))
+        self.assertEqual(helper.delete(Tag.objects.all()), 3)
+        self.assertEqual(len(deleted), 3)
+        self.assertFalse(raw_delete.called)
+        self.assertFalse(Tag.objects.exists())
+
+    def test_delete_with_cascade_uses_collector(self):
+        categories = [Category.objects.create(name="Category %s" % i) for i in range(3)]
+        product = Product.objects.create(name="Chair", price=Decimal("1.00"), category=categories[0])
+        helper = self.get_helper(CategoryTableViewSet)
+        version = get_model_version(Category)
+        self.assertFalse(helper.can_fast_delete(Category.objects.all()))
+        self.assertEqual(helper.delete(Category.objects.all()), 3)
+        self.assertFalse(Category.objects.exists())
+        product.refresh_from_db()
+        self.assertIsNone(product.category)
+        self.assertNotEqual(get_model_version(Category), version)
+
+    def test_update(self):
+        for i in range(5):
+            Product.objects.create(name="Product %s" % i, price=Decimal("1.00"))
+        helper = self.get_helper(ProductViewSet)
+        version = get_model_version(Product)
+        self.assertEqual(helper.update(Product.objects.filter(name__lt="Product 3"), {"status": "published"}), 3)
+        self.assertEqual(Product.objects.filter(status="published").count(), 3)
+        self.assertNotEqual(get_model_version(Product), version)
+
+
+class BulkActionViewTests(TestCase):
+    bulk_url = "/tests/product/bulk/"
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_superuser("admin", "admin@example.com", "password")
+        cls.products = [Product.objects.create(name="Product %s" % i, price=Decimal("1.00")) for i in range(5)]
+        cls.products[4].status = "published"
+        cls.products[4].save()
+
+    def setUp(self):
+        self.client.force_login(self.user)
+        self.viewset = site.get_viewset(ProductViewSet)
+
+    def post(self, data, query=""):
+        return self.client.post(self.bulk_url + query, data)
+
+    def test_opt_in(self):
+        self.assertEqual(viewsets.TableViewSetMixin.bulk_actions, ())
+        urls = [pattern.name for pattern in TestRouter().register(TagViewSet).get_urls()]
+        self.assertNotIn("website_tests_tag_bulk", urls)
+
+    def test_delete_selected(self):
+        response = self.post({"action": "delete", "selected": [self.products[0].pk, self.products[1].pk]})
+        self.assertRedirects(response, "/tests/product/", fetch_redirect_response=False)
+        self.assertEqual(Product.objects.count(), 3)
+
+    def test_delete_select_across(self):
+        version = get_model_version(Product)
+        self.post({"action": "delete", "select_across": "1"}, "?status=draft")
+        self.assertEqual(list(Product.objects.all()), [self.products[4]])
+        self.assertNotEqual(get_model_version(Product), version)
+
+    def test_update_whitelisted_field(self):
+        self.post({"action": "update", "field": "status", "value": "published", "select_across": "1"})
+        self.assertEqual(Product.objects.filter(status="published").count(), 5)
+
+    def test_update_rejected_field(self):
+        version = get_model_version(Product)
+        response = self.post({"action": "update", "field": "price", "value": "9", "select_across": "1"})
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(Product.objects.filter(price=Decimal("9")).exists())
+        self.assertEqual(get_model_version(Product), version)
+
+    def test_permission_denied(self):
+        user = get_user_model().objects.create_user("staff", "staff@example.com", "password", is_staff=True)
+        user.user_permissions.add(Permission.objects.get(codename="view_product"))
+        self.client.force_login(user)
+        self.assertEqual(self.post({"action": "delete", "select_across": "1"}).status_code, 403)
+        response = self.post({"action": "update", "field": "status", "value": "published", "select_across": "1"})
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(Product.objects.count(), 5)
+        self.assertEqual(Product.objects.filter(status="published").count(), 1)
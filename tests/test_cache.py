@@ -0,0 +1,212 @@
+import threading
+from decimal import Decimal
+from time import sleep, time
+from unittest import mock
+
+import django_filters
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import RequestFactory, SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import translation
+
+from django_routes.cache import (
+    _coalesce_locks,
+    coalesce,
+    get_lookup_related_models,
+    make_key,
+    track_model_version,
+)
+
+from .models import Category, Product
+from .urls import site
+from .viewsets import ProductViewSet
+
+
+class CoalesceTests(SimpleTestCase):
+    key = make_key("tests", "coalesce")
+    lease_key = make_key("lease", key)
+
+    def setUp(self):
+        cache.clear()
+        self.calls = 0
+
+    def compute(self, value="fresh", delay=0):
+        def compute():
+            self.calls += 1
+            sleep(delay)
+            return value
+
+        return compute
+
+    def test_miss_computes_once(self):
+        self.assertEqual(coalesce(self.key, self.compute(), 60), "fresh")
+        self.assertEqual(coalesce(self.key, self.compute("other"), 60), "fresh")
+        self.assertEqual(self.calls, 1)
+
+    def test_concurrent_misses_compute_once(self):
+        compute = self.compute(delay=0.1)
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(coalesce(self.key, compute, 60, poll_interval=0.01)))
+            for i in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, ["fresh"] * 5)
+        self.assertEqual(self.calls, 1)
+
+    def test_wait_for_lease_holder(self):
+        # Another process holds the lease and stores its result meanwhile
+        cache.add(self.lease_key, 1)
+        timer = threading.Timer(0.1, lambda: cache.set(self.key, ("theirs", time() + 60)))
+        timer.start()
+        self.assertEqual(coalesce(self.key, self.compute(), 60, poll_interval=0.01), "theirs")
+        timer.join()
+        self.assertEqual(self.calls, 0)
+
+    def test_wait_timeout(self):
+        cache.add(self.lease_key, 1)
+        self.assertEqual(coalesce(self.key, self.compute(), 60, wait_timeout=0.05, poll_interval=0.01), "fresh")
+        self.assertEqual(self.calls, 1)
+
+    def test_lock_released_while_polling(self):
+        cache.add(self.lease_key, 1)
+        lock = _coalesce_locks[hash(self.key) % len(_coalesce_locks)]
+        thread = threading.Thread(target=coalesce, args=(self.key, self.compute(), 60, 0, 30, 0.3, 0.01))
+        thread.start()
+        self.addCleanup(thread.join)
+        sleep(0.1)
+        # Other keys of the stripe aren't blocked by the polling caller
+        self.assertTrue(lock.acquire(timeout=0.05))
+        lock.release()
+
+    def test_stale_value_served_while_revalidating(self):
+        cache.set(self.key, ("stale", time() - 1), 60)
+        cache.add(self.lease_key, 1)
+        self.assertEqual(coalesce(self.key, self.compute(), 60, stale_timeout=60), "stale")
+        self.assertEqual(self.calls, 0)
+
+    def test_stale_value_revalidated(self):
+        cache.set(self.key, ("stale", time() - 1), 60)
+        self.assertEqual(coalesce(self.key, self.compute(), 60, stale_timeout=60), "fresh")
+        self.assertEqual(self.calls, 1)
+        self.assertIsNone(cache.get(self.lease_key))
+
+
+class RenderCacheTests(TestCase):
+    index_url = "/tests/product/"
+
+    def setUp(self):
+        cache.clear()
+        self.viewset = site.get_viewset(ProductViewSet)
+        patcher = mock.patch.object(self.viewset, "index_render_cache", True, create=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def get_key(self, path):
+        view = self.viewset.index_view_class(viewset=self.viewset)
+        return view.get_render_cache_key(RequestFactory().get(path))
+
+    def test_key_holds_language(self):
+        with translation.override("en"):
+            english = self.get_key(self.index_url)
+        with translation.override("id"):
+            indonesian = self.get_key(self.index_url)
+        self.assertNotEqual(english, indonesian)
+
+    def test_anonymous_page_cached(self):
+        Product.objects.create(name="Chair", price=Decimal("10.00"))
+        self.assertContains(self.client.get(self.index_url), "Chair")
+        with self.assertNumQueries(0):
+            self.assertContains(self.client.get(self.index_url), "Chair")
+
+
+class ProductFilterSet(django_filters.FilterSet):
+    category_name = django_filters.CharFilter(field_name="category__name")
+
+    class Meta:
+        model = Product
+        fields = ("status",)
+
+
+class LookupRelatedModelsTests(SimpleTestCase):
+    def test_lookups(self):
+        opts = Product._meta
+        self.assertEqual(get_lookup_related_models(opts, "category__name"), [Category])
+        self.assertEqual(get_lookup_related_models(opts, "category__name__icontains"), [Category])
+        for lookup in ("name", "category", "category__in", "missing"):
+            with self.subTest(lookup=lookup):
+                self.assertEqual(get_lookup_related_models(opts, lookup), [])
+
+
+class FilterPkCacheTests(TestCase):
+    index_url = "/tests/product/"
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_superuser("admin", "admin@example.com", "password")
+        cls.chairs = Category.objects.create(name="Chairs")
+        cls.products = [
+            Product.objects.create(name="Product %s" % i, price=Decimal(i), category=cls.chairs) for i in range(3)
+        ]
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+        self.viewset = site.get_viewset(ProductViewSet)
+        patcher = mock.patch.multiple(
+            self.viewset,
+            filter_pk_cache=True,
+            filter_pk_cache_max=3,
+            filterset_class=ProductFilterSet,
+            paginate_by=2,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        # Done on registration for viewsets declaring `filter_pk_cache`
+        track_model_version(Product)
+
+    def get_page(self, **params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.index_url, params)
+        # The pk list is read with a LIMIT of `filter_pk_cache_max + 1`
+        pk_queries = [query["sql"] for query in queries.captured_queries if "LIMIT 4" in query["sql"]]
+        return response.context, pk_queries
+
+    def test_cache_hit(self):
+        context, pk_queries = self.get_page(category_name="Chairs")
+        self.assertEqual(len(pk_queries), 1)
+        self.assertEqual(context["paginator"].count, 3)
+        context, pk_queries = self.get_page(category_name="Chairs")
+        self.assertEqual(pk_queries, [])
+        self.assertEqual(context["paginator"].count, 3)
+
+    def test_page_in_cached_order(self):
+        with mock.patch.object(self.viewset, "ordering", ("-price",)):
+            self.get_page()
+            context, pk_queries = self.get_page(page=1)
+        self.assertEqual(pk_queries, [])
+        self.assertIn(" IN (", str(context["object_list"].query))
+        self.assertEqual(list(context["object_list"]), [self.products[2], self.products[1]])
+
+    def test_over_cap_fallback(self):
+        Product.objects.create(name="Extra", price=Decimal("9.00"))
+        context, pk_queries = self.get_page()
+        self.assertEqual(len(pk_queries), 1)
+        self.assertEqual(context["paginator"].count, 4)
+        self.assertNotIn(" IN (", str(context["object_list"].query))
+        self.assertEqual(list(context["object_list"]), self.products[:2])
+
+    def test_invalidated_on_save(self):
+        self.get_page(category_name="Chairs")
+        Product.objects.create(name="Extra", price=Decimal("9.00"), category=self.chairs)
+        self.assertEqual(self.get_page(category_name="Chairs")[0]["paginator"].count, 4)
+        self.chairs.name = "Seats"
+        self.chairs.save()
+        context, pk_queries = self.get_page(category_name="Chairs")
+        self.assertEqual(len(pk_queries), 1)
+        self.assertEqual(context["paginator"].count, 0)
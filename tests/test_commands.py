@@ -0,0 +1,64 @@
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+
+from django_routes.management.commands import routes_loadtest as loadtest
+from django_routes.paginator import CachedCountPaginator
+
+from .models import Category, Product
+from .urls import TestRouter, site
+from .viewsets import ProductViewSet
+
+
+class WarmupCommandTests(TestCase):
+    databases = {"default", "replica"}
+
+    def test_warmup(self):
+        stdout = StringIO()
+        call_command("routes_warmup", router="tests.urls.site", pages=1, stdout=stdout)
+        self.assertIn("ProductViewSet", stdout.getvalue())
+        self.assertIn("Warmed up 1 viewsets", stdout.getvalue())
+
+    @override_settings(SIMPEL_SITES={"READ_DATABASE": "replica"})
+    def test_count_primed_on_read_database(self):
+        cache.clear()
+        Product.objects.using("replica").create(name="Chair", price=Decimal("10.00"))
+        viewset = site.get_viewset(ProductViewSet)
+        with mock.patch.object(viewset, "paginator_class", CachedCountPaginator):
+            key = CachedCountPaginator(viewset.get_read_queryset(), 1).get_count_cache_key()
+            # No page is requested, the count comes from the command itself
+            call_command("routes_warmup", router="tests.urls.site", pages=0, stdout=StringIO())
+        entry = cache.get(key)
+        self.assertIsNotNone(entry)
+        self.assertEqual(entry[0], 1)
+
+
+class CategoryProductViewSet(ProductViewSet):
+    filterset_fields = ("category",)
+
+
+class LoadtestCommandTests(TestCase):
+    def test_filter_targets_skip_null_values(self):
+        category = Category.objects.create(name="Chairs")
+        Product.objects.create(name="Chair", price=Decimal("10.00"), category=category)
+        Product.objects.create(name="Lamp", price=Decimal("20.00"))
+        router = TestRouter()
+        router.register(CategoryProductViewSet)
+        targets = loadtest.Command().get_targets(router, {"filter": 1})
+        self.assertEqual([params for label, weight, url, params, headers in targets], [{"category": category.pk}])
+
+    def test_unknown_user(self):
+        with self.assertRaisesMessage(CommandError, "User 'nobody' does not exist."):
+            call_command("routes_loadtest", router="tests.urls.site", user="nobody", stdout=StringIO())
+
+    def test_client_keeps_running_on_errors(self):
+        client = loadtest.Command().get_client(None, None)
+        self.assertFalse(client.raise_request_exception)
+        viewset = site.get_viewset(ProductViewSet)
+        with mock.patch.object(viewset, "get_queryset", side_effect=RuntimeError):
+            with self.assertLogs("django.request", "ERROR"):
+                self.assertEqual(client.get("/tests/product/").status_code, 500)
@@ -0,0 +1,75 @@
+from decimal import Decimal
+from unittest import mock
+
+import django_filters
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+
+from .models import Category, Product
+from .urls import site
+from .viewsets import ProductViewSet
+
+
+class ProductFilterSet(django_filters.FilterSet):
+    # Its name starts with the `category` filter name, but it filters another field
+    category_name = django_filters.CharFilter(field_name="category__name")
+    price = django_filters.RangeFilter()
+
+    class Meta:
+        model = Product
+        fields = ("status", "category")
+
+
+class FacetTests(TestCase):
+    index_url = "/tests/product/"
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_superuser("admin", "admin@example.com", "password")
+        cls.chairs = Category.objects.create(name="Chairs")
+        cls.tables = Category.objects.create(name="Tables")
+        Product.objects.create(name="Chair", price=Decimal("10.00"), category=cls.chairs)
+        Product.objects.create(name="Stool", price=Decimal("20.00"), category=cls.chairs, status="published")
+        Product.objects.create(name="Table", price=Decimal("30.00"), category=cls.tables, status="published")
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+        self.viewset = site.get_viewset(ProductViewSet)
+        patcher = mock.patch.multiple(
+            self.viewset, filterset_class=ProductFilterSet, list_facets=("status", "category")
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def get_facets(self, **params):
+        facets = self.client.get(self.index_url, params).context["facets"]
+        return {
+            facet["name"]: {choice["label"]: (choice["count"], choice["selected"]) for choice in facet["choices"]}
+            for facet in facets
+        }
+
+    def test_counts(self):
+        facets = self.get_facets()
+        self.assertEqual(facets["status"], {"Draft": (1, False), "Published": (2, False)})
+        self.assertEqual(facets["category"], {"Chairs": (2, False), "Tables": (1, False)})
+
+    def test_facet_excludes_its_own_filter(self):
+        facets = self.get_facets(status="draft")
+        self.assertEqual(facets["status"], {"Draft": (1, True), "Published": (2, False)})
+        self.assertEqual(facets["category"], {"Chairs": (1, False)})
+
+    def test_facet_keeps_filters_sharing_its_prefix(self):
+        facets = self.get_facets(category=self.chairs.pk, category_name="Chairs")
+        self.assertEqual(facets["category"], {"Chairs": (2, True)})
+
+    def test_facet_keeps_range_filters(self):
+        facets = self.get_facets(price_min="15")
+        self.assertEqual(facets["category"], {"Chairs": (1, False), "Tables": (1, False)})
+
+    def test_filter_keys(self):
+        view = self.viewset.index_view_class(viewset=self.viewset)
+        filters = ProductFilterSet.base_filters
+        self.assertEqual(view.get_filter_keys("category", filters["category"]), ["category"])
+        self.assertEqual(view.get_filter_keys("price", filters["price"]), ["price_min", "price_max"])
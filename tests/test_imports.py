@@ -0,0 +1,60 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from django.test import SimpleTestCase
+
+# Modules only needed by some actions, which must load on first use
+LAZY_MODULES = (
+    "django_tables2",
+    "django_filters",
+    "django_hookup",
+    "allauth",
+    "django.contrib.admin",
+    "cProfile",
+    "pstats",
+)
+
+IMPORT_SCRIPT = """
+import json, sys
+import django
+django.setup()
+import django_routes.viewsets, django_routes.routers
+print(json.dumps([name for name in %r if name in sys.modules]))
+""" % (
+    LAZY_MODULES,
+)
+
+
+class ImportTests(SimpleTestCase):
+    # Budget of importing the viewsets and routers, from bytecode, in ms
+    import_budget = 30
+    runs = 3
+
+    def run_import(self, pycache):
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE="tests.settings", PYTHONPYCACHEPREFIX=pycache)
+        env.pop("PYTHONDONTWRITEBYTECODE", None)
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", IMPORT_SCRIPT],
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        elapsed = 0
+        for line in result.stderr.splitlines():
+            fields = [field.strip() for field in line.split("|")]
+            if len(fields) == 3 and fields[2] in ("django_routes.viewsets", "django_routes.routers"):
+                elapsed += int(fields[1]) / 1000
+        return json.loads(result.stdout), elapsed
+
+    def test_import(self):
+        with tempfile.TemporaryDirectory() as pycache:
+            # The first run compiles the bytecode, only later ones are timed
+            self.run_import(pycache)
+            runs = [self.run_import(pycache) for i in range(self.runs)]
+        for loaded, elapsed in runs:
+            self.assertEqual(loaded, [])
+        self.assertLess(min(elapsed for loaded, elapsed in runs), self.import_budget)
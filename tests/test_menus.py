@@ -0,0 +1,27 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+
+from .urls import TestRouter
+from .viewsets import ProductViewSet
+
+
+class MenuTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_superuser("admin", "admin@example.com", "password")
+
+    def setUp(self):
+        cache.clear()
+
+    def get_names(self, router):
+        return [item.name for group in router.menu.get_tree(self.user) for item in group.items]
+
+    def test_items_in_cache_key(self):
+        # Same namespace, other registry, e.g. a process that didn't import every URLconf
+        first = TestRouter()
+        second = TestRouter()
+        second.register(ProductViewSet)
+        self.assertNotEqual(first.menu.get_cache_key(self.user), second.menu.get_cache_key(self.user))
+        self.assertEqual(self.get_names(first), [])
+        self.assertEqual(self.get_names(second), ["website_tests_product_index"])
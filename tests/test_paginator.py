@@ -0,0 +1,37 @@
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from django_routes.paginator import CachedCountPaginator
+
+from .models import Product
+from .urls import TestRouter
+from .viewsets import ProductViewSet
+
+
+class CountedProductViewSet(ProductViewSet):
+    paginator_class = CachedCountPaginator
+
+
+class CachedCountPaginatorTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # Registering the viewset tracks the model version
+        TestRouter().register(CountedProductViewSet)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_count_cached(self):
+        Product.objects.create(name="Chair", price=Decimal("10.00"))
+        self.assertEqual(CachedCountPaginator(Product.objects.all(), 10).count, 1)
+        with self.assertNumQueries(0):
+            self.assertEqual(CachedCountPaginator(Product.objects.all(), 10).count, 1)
+
+    def test_count_dropped_on_change(self):
+        Product.objects.create(name="Chair", price=Decimal("10.00"))
+        self.assertEqual(CachedCountPaginator(Product.objects.all(), 10).count, 1)
+        Product.objects.create(name="Table", price=Decimal("20.00"))
+        self.assertEqual(CachedCountPaginator(Product.objects.all(), 10).count, 2)
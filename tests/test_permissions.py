@@ -0,0 +1,95 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group, Permission
+from django.core.cache import cache
+from django.db.models import Q
+from django.test import RequestFactory, TestCase, override_settings
+
+from .models import Note
+from .urls_rows import site
+from .viewsets import NoteViewSet
+
+
+@override_settings(ROOT_URLCONF="tests.urls_rows")
+class RowPermissionTests(TestCase):
+    index_url = "/tests/note/"
+
+    @classmethod
+    def setUpTestData(cls):
+        user_model = get_user_model()
+        group = Group.objects.create(name="Editors")
+        cls.owner = user_model.objects.create_user("owner", "owner@example.com", "password")
+        cls.member = user_model.objects.create_user("member", "member@example.com", "password")
+        cls.member.groups.add(group)
+        cls.viewer = user_model.objects.create_user("viewer", "viewer@example.com", "password")
+        cls.viewer.user_permissions.add(Permission.objects.get(codename="view_note"))
+        cls.owned = Note.objects.create(title="Owned", owner=cls.owner)
+        cls.shared = Note.objects.create(title="Shared", group=group)
+        cls.private = Note.objects.create(title="Private")
+
+    def setUp(self):
+        cache.clear()
+        self.viewset = site.get_viewset(NoteViewSet)
+        self.permission_helper = self.viewset.permission_helper
+
+    def get_list(self, user, **params):
+        if user is not None:
+            self.client.force_login(user)
+        return self.client.get(self.index_url, params)
+
+    def assertRows(self, user, notes):
+        response = self.get_list(user)
+        self.assertEqual(list(response.context["object_list"]), notes)
+        self.assertEqual(response.context["paginator"].count, len(notes))
+        data = self.get_list(user, format="json").json()
+        self.assertEqual([row["title"] for row in data["results"]], [note.title for note in notes])
+        self.assertEqual(data["count"], len(notes))
+        for note in (self.owned, self.shared, self.private):
+            with self.subTest(user=user, note=note.title):
+                response = self.client.get("%sinspect/%s/" % (self.index_url, note.pk))
+                self.assertEqual(response.status_code, 200 if note in notes else 404)
+
+    def test_owner(self):
+        self.assertRows(self.owner, [self.owned])
+
+    def test_group_member(self):
+        self.assertRows(self.member, [self.shared])
+
+    def test_model_permission(self):
+        self.assertRows(self.viewer, [self.owned, self.shared, self.private])
+
+    def test_anonymous(self):
+        self.assertRows(None, [])
+
+    def get_annotated(self, user, note):
+        request = RequestFactory().get(self.index_url)
+        request.user = user
+        return self.viewset.get_queryset(request).get(pk=note.pk)
+
+    def test_object_checks_read_annotations(self):
+        note = self.get_annotated(self.owner, self.owned)
+        ph = self.permission_helper
+        # Model-wide permissions are cached on the user after a first check
+        ph.user_has_any_permissions(self.owner)
+        with self.assertNumQueries(0):
+            self.assertTrue(ph.user_can_inspect_obj(self.owner, note))
+            self.assertTrue(ph.user_can_edit_obj(self.owner, note))
+            self.assertTrue(ph.user_can_delete_obj(self.owner, note))
+        shared = Note.objects.get(pk=self.shared.pk)
+        with self.assertNumQueries(1):
+            self.assertFalse(ph.user_can_edit_obj(self.owner, shared))
+
+    def test_sitemap_lists_rows_open_to_anonymous(self):
+        self.assertNotIn("<url>", self.get_sitemap())
+        # Rules granting rows to anonymous users open them on the sitemap and the inspect pages
+        with mock.patch.object(self.permission_helper, "get_row_permission_q", return_value=Q(owner__isnull=True)):
+            sitemap = self.get_sitemap()
+            response = self.client.get("%sinspect/%s/" % (self.index_url, self.private.pk))
+        self.assertEqual(sitemap.count("<url>"), 2)
+        self.assertIn("/tests/note/inspect/%s/" % self.private.pk, sitemap)
+        self.assertNotIn("/tests/note/inspect/%s/" % self.owned.pk, sitemap)
+        self.assertEqual(response.status_code, 200)
+
+    def get_sitemap(self):
+        return b"".join(self.client.get("/sitemap-tests.note-1.xml").streaming_content).decode()
@@ -0,0 +1,35 @@
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+
+from django_routes.profiling import load_profile, save_profile
+
+
+class ProfilingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_superuser("admin", "admin@example.com", "password")
+
+    def setUp(self):
+        self.client.force_login(self.user)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings = override_settings(SIMPEL_SITES={"PROFILE_DIR": directory.name, "PROFILE_RING_SIZE": 2})
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def test_profiled_request(self):
+        response = self.client.get("/tests/product/", {"_profile": 1})
+        profile = load_profile(response["X-Profile-Id"])
+        self.assertEqual(profile["action"], "index")
+        self.assertIn("function calls", profile["stats"])
+        self.assertTrue(profile["queries"])
+
+    def test_ring_size(self):
+        ids = [save_profile({"created": created}) for created in (1, 2, 3)]
+        self.assertIsNone(load_profile(ids[0]))
+        self.assertIsNotNone(load_profile(ids[2]))
+
+    def test_unprofiled_request(self):
+        self.assertNotIn("X-Profile-Id", self.client.get("/tests/product/"))
@@ -0,0 +1,76 @@
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.contrib.messages.storage.fallback import FallbackStorage
+from django.test import RequestFactory, TestCase, override_settings
+
+from django_routes.views import DeleteView
+
+from .models import Product
+from .urls import site
+from .viewsets import ProductViewSet
+
+REPLICA = {"READ_DATABASE": "replica"}
+
+
+@override_settings(SIMPEL_SITES=REPLICA)
+class ReplicaTests(TestCase):
+    databases = {"default", "replica"}
+    index_url = "/tests/product/"
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_superuser("admin", "admin@example.com", "password")
+        # Each database holds its own row, telling which one was read
+        cls.primary = Product.objects.create(name="Primary", price=Decimal("1.00"))
+        cls.replica = Product.objects.using("replica").create(name="Replica", price=Decimal("2.00"))
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def get_names(self):
+        response = self.client.get(self.index_url, {"format": "json"})
+        return [row["name"] for row in response.json()["results"]]
+
+    def get_bulk_delete(self, pk):
+        return self.client.post("%sbulk/" % self.index_url, {"action": "delete", "selected": [pk]})
+
+    def test_list_reads_replica(self):
+        response = self.client.get(self.index_url)
+        self.assertContains(response, "Replica")
+        self.assertNotContains(response, "Primary")
+
+    def test_json_reads_replica(self):
+        self.assertEqual(self.get_names(), ["Replica"])
+
+    def test_inspect_reads_replica(self):
+        response = self.client.get("%sinspect/%s/" % (self.index_url, self.replica.pk), {"format": "json"})
+        self.assertEqual(response.json()["name"], "Replica")
+
+    def test_bulk_action_writes_primary(self):
+        self.get_bulk_delete(self.primary.pk)
+        self.assertFalse(Product.objects.filter(pk=self.primary.pk).exists())
+        self.assertTrue(Product.objects.using("replica").filter(pk=self.replica.pk).exists())
+
+    def test_delete_view_writes_primary(self):
+        viewset = site.get_viewset(ProductViewSet)
+        request = RequestFactory().post("/")
+        request.user = self.user
+        request.session = self.client.session
+        request._messages = FallbackStorage(request)
+        view = DeleteView.as_view(viewset=viewset, title="", action_context=None)
+        response = view(request, pk=self.primary.pk)
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(Product.objects.filter(pk=self.primary.pk).exists())
+        self.assertTrue(Product.objects.using("replica").filter(pk=self.replica.pk).exists())
+
+    def test_read_after_write_sticks_to_primary(self):
+        product = Product.objects.create(name="Other", price=Decimal("3.00"))
+        self.get_bulk_delete(product.pk)
+        self.assertEqual(self.get_names(), ["Primary"])
+
+    @override_settings(SIMPEL_SITES=dict(REPLICA, READ_AFTER_WRITE_SECONDS=0))
+    def test_read_after_write_window_expired(self):
+        product = Product.objects.create(name="Other", price=Decimal("3.00"))
+        self.get_bulk_delete(product.pk)
+        self.assertEqual(self.get_names(), ["Replica"])
@@ -0,0 +1,42 @@
+import sys
+
+from django.test import TestCase, override_settings
+from django.urls import clear_url_caches, reverse
+
+from .models import Category
+from .urls import site
+from .viewsets import CategoryViewSet
+
+
+class RegisterTests(TestCase):
+    def tearDown(self):
+        if site.get_viewset(CategoryViewSet) is not None:
+            site.unregister(CategoryViewSet)
+        clear_url_caches()
+
+    def test_register_in_urlconf_after_urls_built(self):
+        sys.modules.pop("tests.urls_late", None)
+        with override_settings(ROOT_URLCONF="tests.urls_late"):
+            clear_url_caches()
+            self.assertEqual(reverse("late_tests_category_index"), "/late/tests/category/")
+            response = self.client.get("/late/tests/category/")
+            self.assertEqual(response.status_code, 200)
+        clear_url_caches()
+
+    def test_register_does_not_import_urlconf(self):
+        sys.modules.pop("tests.urls_late", None)
+        with override_settings(ROOT_URLCONF="tests.urls_late"):
+            clear_url_caches()
+            site.register(CategoryViewSet)
+            self.assertNotIn("tests.urls_late", sys.modules)
+        clear_url_caches()
+
+    def test_register_after_urls_loaded(self):
+        reverse("website_tests_product_index")
+        site.register(CategoryViewSet)
+        self.assertEqual(reverse("website_tests_category_index"), "/tests/category/")
+        Category.objects.create(name="Books")
+        self.assertEqual(self.client.get("/tests/category/").status_code, 200)
+        site.unregister(CategoryViewSet)
+        with self.assertRaises(Exception):
+            reverse("website_tests_category_index")
@@ -0,0 +1,76 @@
+from decimal import Decimal
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import NoReverseMatch, reverse
+
+from django_routes.sitemaps import RouterSitemap
+
+from .models import Product
+from .urls import TestRouter
+from .viewsets import ProductViewSet
+
+
+class SitemapTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def get_content(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response["Content-Type"], "application/xml")
+        return b"".join(response.streaming_content).decode()
+
+    def test_disabled_by_default(self):
+        with self.assertRaises(NoReverseMatch):
+            reverse("website_sitemap")
+
+    @override_settings(ROOT_URLCONF="tests.urls_sitemap")
+    def test_sitemap(self):
+        products = [Product.objects.create(name="Product %s" % i, price=Decimal("1.00")) for i in range(3)]
+        index = self.get_content("/sitemap.xml")
+        self.assertIn("<loc>http://testserver/sitemap-tests.product-1.xml</loc>", index)
+        section = self.get_content("/sitemap-tests.product-1.xml")
+        for product in products:
+            self.assertIn("<loc>http://testserver/tests/product/inspect/%s/</loc>" % product.pk, section)
+
+    @override_settings(ROOT_URLCONF="tests.urls_sitemap")
+    def test_section_pages(self):
+        for i in range(3):
+            Product.objects.create(name="Product %s" % i, price=Decimal("1.00"))
+        with mock.patch.object(RouterSitemap, "limit", 2):
+            index = self.get_content("/sitemap.xml")
+            self.assertIn("sitemap-tests.product-2.xml", index)
+            self.assertEqual(self.get_content("/sitemap-tests.product-1.xml").count("<url>"), 2)
+            self.assertEqual(self.get_content("/sitemap-tests.product-2.xml").count("<url>"), 1)
+        self.assertEqual(self.client.get("/sitemap-unknown-1.xml").status_code, 404)
+
+    @override_settings(ROOT_URLCONF="tests.urls_sitemap")
+    def test_sections_split_by_pk_range(self):
+        products = [Product.objects.create(name="Product %s" % i, price=Decimal("1.00")) for i in range(6)]
+        products[1].delete()
+        with mock.patch.object(RouterSitemap, "limit", 2):
+            index = self.get_content("/sitemap.xml")
+            self.assertIn("sitemap-tests.product-3.xml", index)
+            self.assertNotIn("sitemap-tests.product-4.xml", index)
+            # Pages read the boundaries the index computed
+            with mock.patch.object(RouterSitemap, "compute_boundaries") as compute_boundaries:
+                section = self.get_content("/sitemap-tests.product-2.xml")
+                self.assertEqual(self.get_content("/sitemap-tests.product-4.xml").count("<url>"), 0)
+            self.assertFalse(compute_boundaries.called)
+        self.assertEqual(section.count("<url>"), 2)
+        for product in products[3:5]:
+            self.assertIn("/tests/product/inspect/%s/" % product.pk, section)
+
+    def test_boundaries(self):
+        products = [Product.objects.create(name="Product %s" % i, price=Decimal("1.00")) for i in range(5)]
+        sitemap = RouterSitemap(TestRouter())
+        viewset = TestRouter().register(ProductViewSet)
+        with mock.patch.object(RouterSitemap, "limit", 2):
+            self.assertEqual(sitemap.compute_boundaries(viewset), [products[1].pk, products[3].pk])
+            sql = str(sitemap.get_page_queryset(viewset, 2).query)
+            self.assertNotIn("OFFSET", sql)
+            self.assertIn('"id" > %s' % products[1].pk, sql)
+            self.assertIn('"id" <= %s' % products[3].pk, sql)
+            Product.objects.filter(pk=products[4].pk).delete()
+            self.assertEqual(sitemap.compute_boundaries(viewset), [products[1].pk])
@@ -0,0 +1,33 @@
+from django.test import SimpleTestCase
+
+from django_routes.helpers import PermissionHelper
+from django_routes.routers import DefaultRouter
+
+from .viewsets import ProductViewSet
+
+
+class OtherRouter(DefaultRouter):
+    namespace = "other"
+
+
+class ProductPermissionHelper(PermissionHelper):
+    pass
+
+
+class HookedProductViewSet(ProductViewSet):
+    def get_permission_helper_class(self):
+        return ProductPermissionHelper
+
+
+class ViewSetSpecTests(SimpleTestCase):
+    def test_spec_shared_between_routers(self):
+        first = OtherRouter().register(ProductViewSet)
+        second = OtherRouter().register(ProductViewSet)
+        self.assertIs(first.spec, second.spec)
+        self.assertIs(first.permission_helper, second.permission_helper)
+
+    def test_permission_helper_class_hook(self):
+        viewset = OtherRouter().register(HookedProductViewSet)
+        self.assertIsInstance(viewset.permission_helper, ProductPermissionHelper)
+        self.assertIsInstance(OtherRouter().register(ProductViewSet).permission_helper, PermissionHelper)
+        self.assertNotIsInstance(OtherRouter().register(ProductViewSet).permission_helper, ProductPermissionHelper)
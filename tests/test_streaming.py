@@ -0,0 +1,47 @@
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from .models import Product
+from .urls import site
+from .viewsets import ProductViewSet
+
+
+class StreamingTests(TestCase):
+    index_url = "/tests/product/"
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_superuser("admin", "admin@example.com", "password")
+        for i in range(5):
+            Product.objects.create(name="Product %s" % i, price=Decimal("1.00"))
+
+    def setUp(self):
+        self.client.force_login(self.user)
+        self.viewset = site.get_viewset(ProductViewSet)
+        patcher = mock.patch.multiple(self.viewset, index_streaming=True, index_stream_chunk_size=2)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_rows_streamed_in_chunks(self):
+        response = self.client.get(self.index_url)
+        self.assertTrue(response.streaming)
+        parts = [part.decode() for part in response.streaming_content]
+        self.assertEqual([part.count("<tr") for part in parts if "<tbody>" not in part and "<tr" in part], [2, 2, 1])
+        content = "".join(parts)
+        self.assertEqual(content.count("</table>"), 1)
+        for i in range(5):
+            self.assertIn("Product %s" % i, content)
+
+    def test_same_rows_as_rendered_page(self):
+        streamed = b"".join(self.client.get(self.index_url).streaming_content).decode()
+        with mock.patch.object(self.viewset, "index_streaming", False):
+            rendered = self.client.get(self.index_url).content.decode()
+        self.assertEqual(streamed.count("<tr"), rendered.count("<tr"))
+
+    def test_json_not_streamed(self):
+        response = self.client.get(self.index_url, {"format": "json"})
+        self.assertFalse(response.streaming)
+        self.assertEqual(len(response.json()["results"]), 5)
@@ -0,0 +1,176 @@
+import datetime
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import models
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from django_tables2 import tables
+
+from django_routes.tables import ValuesTable, get_field_formatter, resolve_values_field
+
+from .models import Category, Product
+from .urls import site
+from .viewsets import ProductViewSet
+
+
+class ResolveValuesFieldTests(SimpleTestCase):
+    opts = Product._meta
+
+    def test_concrete_field(self):
+        self.assertEqual(resolve_values_field(self.opts, "price"), self.opts.get_field("price"))
+
+    def test_forward_relation_lookup(self):
+        self.assertEqual(resolve_values_field(self.opts, "category__name"), Category._meta.get_field("name"))
+
+    def test_fallback(self):
+        # Bare relations, reverse relations, unknown names and methods need the instance
+        for name in ("category", "category__product__name", "category__missing", "missing", "__str__"):
+            with self.subTest(name=name):
+                self.assertIsNone(resolve_values_field(self.opts, name))
+        self.assertIsNone(resolve_values_field(Category._meta, "product__name"))
+
+
+class FieldFormatterTests(SimpleTestCase):
+    def get_formatter(self, field):
+        return get_field_formatter(field, "-")
+
+    def test_choices(self):
+        format_value = self.get_formatter(Product._meta.get_field("status"))
+        self.assertEqual(format_value("published"), "Published")
+        self.assertEqual(format_value("<b>"), "&lt;b&gt;")
+        self.assertEqual(format_value(None), "-")
+
+    def test_boolean(self):
+        format_value = self.get_formatter(Product._meta.get_field("is_active"))
+        self.assertEqual(format_value(True), "Yes")
+        self.assertEqual(format_value(False), "No")
+        self.assertEqual(format_value(None), "-")
+
+    @override_settings(USE_TZ=True, TIME_ZONE="Europe/Paris", USE_L10N=False, DATETIME_FORMAT="Y-m-d H:i")
+    def test_datetime(self):
+        format_value = self.get_formatter(models.DateTimeField())
+        value = datetime.datetime(2020, 1, 1, 12, 0, tzinfo=timezone.utc)
+        self.assertEqual(format_value(value), "2020-01-01 13:00")
+        self.assertEqual(format_value(None), "-")
+
+    def test_decimal(self):
+        format_value = self.get_formatter(Product._meta.get_field("price"))
+        self.assertEqual(format_value(Decimal("9.50")), "9.50")
+        self.assertEqual(format_value(None), "-")
+
+    def test_text(self):
+        format_value = self.get_formatter(Product._meta.get_field("name"))
+        self.assertEqual(format_value("<i>Chair</i>"), "&lt;i&gt;Chair&lt;/i&gt;")
+        self.assertEqual(format_value(""), "-")
+
+
+class ProductTable(tables.Table):
+    class Meta:
+        model = Product
+        fields = ("name",)
+
+
+class GetTableTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_superuser("admin", "admin@example.com", "password")
+        chairs = Category.objects.create(name="Chairs")
+        Product.objects.create(name="Chair", price=Decimal("10.00"), category=chairs)
+
+    def setUp(self):
+        self.viewset = site.get_viewset(ProductViewSet)
+        self.request = RequestFactory().get("/tests/product/")
+        self.request.user = self.user
+
+    def get_table(self, **attrs):
+        with mock.patch.multiple(self.viewset, **attrs):
+            return self.viewset.get_table(self.request, Product.objects.all())
+
+    def test_values_table(self):
+        table = self.get_table(list_display=("name", "category__name", "status"))
+        self.assertIsInstance(table, ValuesTable)
+        self.assertEqual([row.raw for row in table.rows], [["Chair", "Chairs", "draft"]])
+        self.assertIn('<td class="field-category__name">Chairs</td>', str(table))
+
+    def test_method_column_fallback(self):
+        table = self.get_table(list_display=("name", "__str__"))
+        self.assertIsInstance(table, tables.Table)
+
+    def test_custom_table_class(self):
+        table = self.get_table(table_class=ProductTable)
+        self.assertIsInstance(table, ProductTable)
+
+
+class RowCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_superuser("admin", "admin@example.com", "password")
+        cls.chair = Product.objects.create(name="Chair", price=Decimal("10.00"))
+        cls.stool = Product.objects.create(name="Stool", price=Decimal("20.00"))
+
+    def setUp(self):
+        cache.clear()
+        self.viewset = site.get_viewset(ProductViewSet)
+        self.request = RequestFactory().get("/tests/product/")
+        self.request.user = self.user
+        self.patch(self.viewset, table_row_cache=True)
+        patcher = mock.patch.object(ValuesTable, "render_row", autospec=True, side_effect=ValuesTable.render_row)
+        self.addCleanup(patcher.stop)
+        self.render_row = patcher.start()
+
+    def patch(self, target, **attrs):
+        patcher = mock.patch.multiple(target, **attrs)
+        self.addCleanup(patcher.stop)
+        return patcher.start()
+
+    def get_table(self):
+        return self.viewset.get_table(self.request, Product.objects.all())
+
+    def render(self):
+        self.render_row.reset_mock()
+        html = self.get_table().render_cached_rows()
+        return html, [call.args[1].pk for call in self.render_row.call_args_list]
+
+    def get_keys(self):
+        table = self.get_table()
+        return [table.get_row_cache_key(row, table.get_row_extras(row)) for row in table.rows]
+
+    def test_misses_rendered_once(self):
+        html, rendered = self.render()
+        self.assertEqual(rendered, [self.chair.pk, self.stool.pk])
+        with mock.patch.object(cache, "get_many", wraps=cache.get_many) as get_many:
+            self.assertEqual(self.render(), (html, []))
+        get_many.assert_called_once()
+
+        Product.objects.filter(pk=self.stool.pk).update(name="Bar stool")
+        html, rendered = self.render()
+        self.assertEqual(rendered, [self.stool.pk])
+        self.assertIn("Bar stool", html[1])
+
+    def test_version_field(self):
+        self.patch(self.viewset, table_row_version_field="is_active")
+        self.render()
+        # The version field alone decides whether a row changed
+        Product.objects.filter(pk=self.chair.pk).update(name="Armchair")
+        self.assertEqual(self.render()[1], [])
+        Product.objects.filter(pk=self.chair.pk).update(is_active=False)
+        html, rendered = self.render()
+        self.assertEqual(rendered, [self.chair.pk])
+        self.assertIn("Armchair", html[0])
+
+    def test_keys_vary_with_row_extras(self):
+        keys = self.get_keys()
+        with mock.patch.object(self.viewset, "get_extra_attrs_for_row", return_value={"data-new": "1"}):
+            attrs_keys = self.get_keys()
+        with mock.patch.object(self.viewset, "get_extra_class_names_for_field_col", return_value=["new"]):
+            classname_keys = self.get_keys()
+        self.assertEqual(len({tuple(keys), tuple(attrs_keys), tuple(classname_keys)}), 3)
+        self.assertEqual(self.get_keys(), keys)
+
+    def test_keys_vary_with_permission_fingerprint(self):
+        keys = self.get_keys()
+        with mock.patch.object(self.viewset, "get_row_permission_fingerprint", return_value="100"):
+            self.assertNotEqual(self.get_keys(), keys)
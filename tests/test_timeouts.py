@@ -0,0 +1,96 @@
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.paginator import Paginator
+from django.db import connection
+from django.test import TestCase
+
+from django_routes.paginator import UncountedPaginator
+from django_routes.timeouts import QueryTimeout, statement_timeout
+
+from .models import Product
+from .urls import site
+from .viewsets import ProductViewSet
+
+# Runs for seconds on SQLite, well past the timeouts below
+SLOW_SQL = (
+    "(WITH RECURSIVE counter(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM counter WHERE x < 100000000) "
+    "SELECT COUNT(*) FROM counter) > 0"
+)
+
+
+def slow_count(paginator):
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT %s" % SLOW_SQL)
+    return 0
+
+
+class StatementTimeoutTests(TestCase):
+    def test_timeout(self):
+        Product.objects.create(name="Chair", price=Decimal("10.00"))
+        with self.assertRaises(QueryTimeout):
+            with statement_timeout(0.05):
+                list(Product.objects.extra(where=[SLOW_SQL]))
+        # Outside of the block, statements aren't capped anymore
+        self.assertEqual(Product.objects.count(), 1)
+
+    def test_no_timeout(self):
+        with statement_timeout(None):
+            self.assertEqual(list(Product.objects.all()), [])
+
+
+class ListTimeoutTests(TestCase):
+    index_url = "/tests/product/"
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_superuser("admin", "admin@example.com", "password")
+        for i in range(3):
+            Product.objects.create(name="Product %s" % i, price=Decimal("1.00"))
+
+    def setUp(self):
+        self.client.force_login(self.user)
+        self.viewset = site.get_viewset(ProductViewSet)
+        self.patch(self.viewset, action_statement_timeouts={"index": 0.05}, paginate_by=2)
+
+    def patch(self, target, **attrs):
+        patcher = mock.patch.multiple(target, **attrs)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_count_timeout_paginates_uncounted(self):
+        self.patch(Paginator, count=property(slow_count))
+        with self.assertLogs("engine", "WARNING"):
+            response = self.client.get(self.index_url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIsInstance(response.context["paginator"], UncountedPaginator)
+        page = response.context["page_obj"]
+        self.assertTrue(page.has_next())
+        self.assertEqual(len(page.object_list), 2)
+
+    def test_count_timeout_json(self):
+        self.patch(Paginator, count=property(slow_count))
+        with self.assertLogs("engine", "WARNING"):
+            data = self.client.get(self.index_url, {"format": "json", "page": 2}).json()
+        self.assertIsNone(data["count"])
+        self.assertEqual(data["previous"], 1)
+        self.assertIsNone(data["next"])
+        self.assertEqual(len(data["results"]), 1)
+
+    def get_slow_queryset(self, request=None):
+        return Product.objects.extra(where=[SLOW_SQL])
+
+    def test_list_timeout(self):
+        self.patch(self.viewset, get_queryset=self.get_slow_queryset)
+        with self.assertLogs("engine", "WARNING"):
+            response = self.client.get(self.index_url)
+        self.assertEqual(response.status_code, 504)
+        self.assertContains(response, "refine your filters", status_code=504)
+
+    def test_list_timeout_json(self):
+        self.patch(self.viewset, get_queryset=self.get_slow_queryset)
+        with self.assertLogs("engine", "WARNING"):
+            response = self.client.get(self.index_url, {"format": "json"})
+        self.assertEqual(response.status_code, 504)
+        self.assertIn("detail", response.json())
@@ -0,0 +1,78 @@
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import RequestFactory, TestCase
+
+from .models import Product
+from .urls import site
+from .viewsets import ProductViewSet
+
+
+class ViewTestCase(TestCase):
+    index_url = "/tests/product/"
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_superuser("admin", "admin@example.com", "password")
+        cls.product = Product.objects.create(name="Chair", price=Decimal("10.00"), status="published")
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def inspect_url(self, obj):
+        return "%sinspect/%s/" % (self.index_url, obj.pk)
+
+
+class ContentNegotiationTests(ViewTestCase):
+    def assertVaryAccept(self, response):
+        self.assertIn("Accept", [header.strip() for header in response["Vary"].split(",")])
+
+    def test_list_varies_on_accept(self):
+        html = self.client.get(self.index_url)
+        self.assertEqual(html.status_code, 200)
+        self.assertVaryAccept(html)
+        json = self.client.get(self.index_url, HTTP_ACCEPT="application/json")
+        self.assertEqual(json["Content-Type"], "application/json")
+        self.assertVaryAccept(json)
+
+    def test_inspect_varies_on_accept(self):
+        html = self.client.get(self.inspect_url(self.product))
+        self.assertEqual(html.status_code, 200)
+        self.assertVaryAccept(html)
+        json = self.client.get(self.inspect_url(self.product), HTTP_ACCEPT="application/json")
+        self.assertEqual(json["Content-Type"], "application/json")
+        self.assertVaryAccept(json)
+
+
+class FragmentTests(ViewTestCase):
+    def assertVaryFragment(self, response):
+        self.assertIn("X-Fragment", [header.strip() for header in response["Vary"].split(",")])
+
+    def assertFragment(self, response):
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([template.name for template in response.templates], ["website/index_fragment.html"])
+        self.assertNotIn("filter", response.context)
+        self.assertEqual(list(response.context["object_list"]), [self.product])
+        self.assertContains(response, "Chair")
+        self.assertVaryFragment(response)
+
+    def test_header(self):
+        self.assertFragment(self.client.get(self.index_url, HTTP_X_FRAGMENT="1"))
+
+    def test_param(self):
+        self.assertFragment(self.client.get(self.index_url, {"_fragment": "1"}))
+
+    def test_full_page(self):
+        response = self.client.get(self.index_url)
+        self.assertIn("website/index.html", [template.name for template in response.templates])
+        self.assertIn("filter", response.context)
+        self.assertVaryFragment(response)
+
+    def test_is_fragment_request(self):
+        viewset = site.get_viewset(ProductViewSet)
+        view = viewset.index_view_class(viewset=viewset)
+        factory = RequestFactory()
+        self.assertTrue(view.is_fragment_request(factory.get(self.index_url, HTTP_X_FRAGMENT="1")))
+        self.assertTrue(view.is_fragment_request(factory.get(self.index_url, {"_fragment": "1"})))
+        self.assertFalse(view.is_fragment_request(factory.get(self.index_url)))
+        self.assertFalse(view.is_fragment_request(factory.get(self.index_url, {"_fragment": ""})))
@@ -0,0 +1,57 @@
+import threading
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import RequestFactory, TransactionTestCase
+
+from .models import Product
+from .urls import site
+from .viewsets import ProductViewSet
+
+
+class ActionContextTests(TransactionTestCase):
+    def setUp(self):
+        self.viewset = site.get_viewset(ProductViewSet)
+        Product.objects.create(name="Chair", price=Decimal("10.00"))
+        user_model = get_user_model()
+        self.users = [user_model.objects.create_superuser("admin%s" % i, "", "password") for i in range(4)]
+
+    def test_concurrent_requests_share_no_state(self):
+        barrier = threading.Barrier(len(self.users))
+        results = {}
+
+        def serve(user):
+            request = RequestFactory().get("/tests/product/")
+            request.user = user
+            barrier.wait()
+            try:
+                response = self.viewset.index_view(request)
+                results[user.pk] = (request, response)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=serve, args=(user,)) for user in self.users]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(results), len(self.users))
+        for request, response in results.values():
+            self.assertEqual(response.status_code, 200)
+            action_context = response.context_data["action_context"]
+            self.assertIs(action_context.request, request)
+            self.assertEqual(action_context.action, "index")
+            # The table buttons are bound to the request they render
+            self.assertIs(response.context_data["table"].button_helper.request, request)
+        self.assertNotIn("request", vars(self.viewset))
+        self.assertNotIn("action_context", vars(self.viewset))
+
+    def test_button_helper_hook(self):
+        request = RequestFactory().get("/tests/product/")
+        request.user = self.users[0]
+        action_context = self.viewset.get_action_context(request, "index")
+        table = self.viewset.get_table(request, Product.objects.all(), action_context=action_context)
+        self.assertIs(table.action_context, action_context)
+        self.assertIs(table.button_helper.request, request)
@@ -0,0 +1,13 @@
+from django_routes.routers import DefaultRouter
+
+from .viewsets import ProductViewSet
+
+
+class TestRouter(DefaultRouter):
+    namespace = "website"
+
+
+site = TestRouter()
+site.register(ProductViewSet)
+
+urlpatterns = site.urls
@@ -0,0 +1,21 @@
+"""
+A root URLconf registering a viewset on a router whose urls were built
+already, e.g. by an included `urls` module, before defining its patterns.
+"""
+from django.urls import include, path
+
+from django_routes.routers import DefaultRouter
+
+from .viewsets import CategoryViewSet
+
+
+class LateRouter(DefaultRouter):
+    namespace = "late"
+
+
+site = LateRouter()
+site.urls
+
+site.register(CategoryViewSet)
+
+urlpatterns = [path("late/", include(site.urls))]
@@ -0,0 +1,15 @@
+"""A root URLconf serving a viewset whose permission helper applies row rules."""
+from django_routes.routers import DefaultRouter
+
+from .viewsets import NoteViewSet
+
+
+class RowsRouter(DefaultRouter):
+    namespace = "website"
+    sitemap_enabled = True
+
+
+site = RowsRouter()
+site.register(NoteViewSet)
+
+urlpatterns = site.urls
@@ -0,0 +1,14 @@
+from django_routes.routers import DefaultRouter
+
+from .viewsets import ProductViewSet
+
+
+class SitemapRouter(DefaultRouter):
+    namespace = "sitemap"
+    sitemap_enabled = True
+
+
+site = SitemapRouter()
+site.register(ProductViewSet)
+
+urlpatterns = site.urls
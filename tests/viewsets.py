@@ -0,0 +1,31 @@
+from django_routes import viewsets
+from django_routes.helpers import PermissionHelper
+
+from .models import Category, Note, Product
+
+
+class ProductViewSet(viewsets.InspectViewSetMixin, viewsets.TableViewSetMixin):
+    model = Product
+    list_display = ("name", "price", "status")
+    filterset_fields = ("status", "is_active", "category")
+    table_values_rows = True
+    bulk_actions = ("delete", "update")
+    bulk_update_fields = ("status",)
+
+
+class CategoryViewSet(viewsets.ReadOnlyViewSet):
+    model = Category
+    filterset_fields = ("name",)
+
+
+class NotePermissionHelper(PermissionHelper):
+    owner_field = "owner"
+    group_field = "group"
+
+
+class NoteViewSet(viewsets.InspectViewSetMixin, viewsets.TableViewSetMixin):
+    model = Note
+    permission_helper_class = NotePermissionHelper
+    list_display = ("title",)
+    filterset_fields = ("title",)
+    table_values_rows = True